@@ -0,0 +1,119 @@
+
+
+import os
+import random
+import string
+import tempfile
+import timeit
+import click
+
+from sqlalchemy.sql import text
+
+from hol import config
+from hol.models import BaseModel, Count
+from hol.utils import flatten_dict
+
+
+def flush_reference(counts):
+
+    """
+    The original row-at-a-time flush, for comparison. Token ids are looked
+    up per row, as they would be in the original schema's subquery.
+
+    Args:
+        counts (dict): year -> token -> count
+    """
+
+    session = config.Session()
+
+    register = text("""
+        INSERT OR IGNORE INTO token (token) VALUES (:token)
+    """)
+
+    query = text("""
+
+        INSERT OR REPLACE INTO count (token_id, year, count)
+
+        VALUES (
+            (SELECT id FROM token WHERE token = :token),
+            :year,
+            :count + COALESCE(
+                (
+                    SELECT count FROM count
+                    JOIN token ON token.id = count.token_id
+                    WHERE token.token = :token AND year = :year
+                ),
+                0
+            )
+        )
+
+    """)
+
+    for year, token, count in flatten_dict(counts):
+
+        session.execute(register, dict(token=token))
+
+        session.execute(query, dict(
+            token=token,
+            year=year,
+            count=count,
+        ))
+
+    session.commit()
+
+
+@click.command()
+
+@click.option(
+    '--years',
+    help='Years in the result.',
+    default=50,
+)
+
+@click.option(
+    '--tokens',
+    help='Tokens per year.',
+    default=2000,
+)
+
+def bench_flush(years, tokens):
+
+    """
+    Time the row-at-a-time and bulk Count flushes on a fresh database.
+    """
+
+    vocab = [
+        ''.join(random.choice(string.ascii_lowercase) for _ in range(8))
+        for _ in range(tokens)
+    ]
+
+    counts = {
+        year: {token: random.randint(1, 1000) for token in vocab}
+        for year in range(1800, 1800+years)
+    }
+
+    rows = sum(map(len, counts.values()))
+
+    for name, func in (
+        ('reference', flush_reference),
+        ('flush', Count.flush),
+    ):
+
+        fd, path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+
+        config.config['database'] = 'sqlite:///{}'.format(path)
+        config.Session = config.build_sessionmaker()
+
+        BaseModel.metadata.create_all(config.build_engine())
+
+        # Flush twice, to time inserts and then merges.
+        secs = timeit.timeit(lambda: func(counts), number=2)
+
+        print('{0:<20} {1:>12.0f} rows/s'.format(name, 2*rows / secs))
+
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    bench_flush()
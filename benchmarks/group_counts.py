@@ -0,0 +1,59 @@
+
+
+import random
+import timeit
+import click
+import numpy as np
+
+from hol.utils import group_counts, group_ranges_array, _group_counts_naive
+
+
+
+@click.command()
+
+@click.option(
+    '--pages',
+    help='Pages per volume.',
+    default=5000,
+)
+
+@click.option(
+    '--size',
+    help='Target group size.',
+    default=1000,
+)
+
+@click.option(
+    '--repeat',
+    help='Timing repetitions.',
+    default=5,
+)
+
+def bench_group_counts(pages, size, repeat):
+
+    """
+    Time the page grouping implementations on a synthetic volume.
+    """
+
+    rng = random.Random(0)
+
+    counts = [rng.randint(0, 600) for _ in range(pages)]
+
+    array = np.array(counts)
+
+    assert group_counts(counts, size) == _group_counts_naive(counts, size)
+
+    for name, func in (
+        ('reference', lambda: _group_counts_naive(counts, size)),
+        ('group_counts', lambda: group_counts(counts, size)),
+        ('group_ranges_array', lambda: group_ranges_array(array, size)),
+    ):
+
+        secs = min(timeit.repeat(func, number=1, repeat=repeat))
+
+        print('{0:<20} {1:.5f}s'.format(name, secs))
+
+
+
+if __name__ == '__main__':
+    bench_group_counts()
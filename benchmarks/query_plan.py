@@ -0,0 +1,123 @@
+
+
+import os
+import random
+import string
+import tempfile
+import timeit
+import click
+
+from hol import config
+from hol.models import BaseModel, Count, AnchoredCount
+
+
+QUERIES = {
+
+    'Count.year_count_series': lambda: (
+        Count.year_count_series(1850, 1860)
+    ),
+
+    'Count.token_counts_by_year': lambda: (
+        Count.token_counts_by_year(1850, 1860)
+    ),
+
+    'AnchoredCount.total_count_by_year_and_level': lambda: (
+        AnchoredCount.total_count_by_year_and_level(1850, 1860, 1, 2)
+    ),
+
+    'AnchoredCount.token_counts_by_year_and_level': lambda: (
+        AnchoredCount.token_counts_by_year_and_level(1850, 1860, 1, 2)
+    ),
+
+}
+
+
+PLANS = (
+
+    """
+    SELECT token_id, sum(count) FROM count
+    WHERE year >= 1850 AND year <= 1860
+    GROUP BY token_id
+    """,
+
+    """
+    SELECT token_id, sum(count) FROM anchored_count
+    WHERE year >= 1850 AND year <= 1860
+    AND anchor_count >= 1 AND anchor_count <= 2
+    GROUP BY token_id
+    """,
+
+)
+
+
+@click.command()
+
+@click.option(
+    '--years',
+    help='Years in the tables.',
+    default=100,
+)
+
+@click.option(
+    '--tokens',
+    help='Tokens per year.',
+    default=2000,
+)
+
+@click.option(
+    '--repeat',
+    help='Timing repetitions.',
+    default=5,
+)
+
+def bench_query_plan(years, tokens, repeat):
+
+    """
+    Print query plans and timings for the year / level range queries.
+    """
+
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+
+    config.config['database'] = 'sqlite:///{}'.format(path)
+    config.Session = config.build_sessionmaker()
+
+    BaseModel.metadata.create_all(config.build_engine())
+
+    vocab = [
+        ''.join(random.choice(string.ascii_lowercase) for _ in range(8))
+        for _ in range(tokens)
+    ]
+
+    year_range = range(1800, 1800+years)
+
+    Count.flush({
+        year: {token: random.randint(1, 1000) for token in vocab}
+        for year in year_range
+    })
+
+    AnchoredCount.flush({1000: {'anchor': {
+        year: {
+            level: {token: random.randint(1, 100) for token in vocab}
+            for level in range(1, 5)
+        }
+        for year in year_range
+    }}})
+
+    with config.get_session() as session:
+        for sql in PLANS:
+            for row in session.execute('EXPLAIN QUERY PLAN ' + sql):
+                print(row[-1])
+            print()
+
+    for name, func in QUERIES.items():
+
+        secs = min(timeit.repeat(func, number=1, repeat=repeat))
+
+        print('{0:<50} {1:.5f}s'.format(name, secs))
+
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    bench_query_plan()
@@ -1,7 +1,5 @@
 
 
-from collections import OrderedDict
-
 from hol.models import AnchoredCount
 from hol.wpm import WPM
 
@@ -9,7 +7,7 @@ from hol.wpm import WPM
 class AnchoredCountWPM(WPM):
 
 
-    def __init__(self, year1, year2):
+    def __init__(self, year1, year2, anchor=None, page_size=None):
 
         """
         Cache token -> WPM maps for anchored pages.
@@ -17,18 +15,10 @@ class AnchoredCountWPM(WPM):
         Args:
             year1 (int)
             year2 (int)
+            anchor (str)
+            page_size (int)
         """
 
-        self.wpms = OrderedDict()
-
-        totals = AnchoredCount.year_count_series(year1, year2)
-
-        for year in totals.keys():
-
-            counts = AnchoredCount.token_counts_by_year_and_level(year, year)
-
-            wpm = {}
-            for token, count in counts.items():
-                wpm[token] = (1e6*count) / totals[year]
-
-            self.wpms[year] = wpm
+        super().__init__(AnchoredCount.year_token_counts(
+            year1, year2, anchor, page_size,
+        ))
@@ -0,0 +1,132 @@
+import hashlib
+import marshal
+
+from functools import wraps
+
+from sqlalchemy import text
+
+from hol import config
+
+
+# (Memory, memoized call) - rebuilt when config.mem is swapped out.
+memo = (None, None)
+
+
+def db_revision():
+
+    """
+    Get the database revision, which is bumped on every write.
+
+    Returns: int
+    """
+
+    with config.get_session() as session:
+        return session.execute(text('PRAGMA user_version')).scalar()
+
+
+def bump_revision(cursor):
+
+    """
+    Mark the database as changed, so cached query results go stale.
+
+    Args:
+        cursor (sqlite3.Cursor)
+    """
+
+    cursor.execute('PRAGMA user_version')
+
+    revision = cursor.fetchone()[0]
+
+    cursor.execute('PRAGMA user_version = {}'.format(revision+1))
+
+
+def reduce_cache():
+
+    """
+    Evict old results beyond the cache size limit. Scans the cache directory,
+    so this runs once per bulk write, not on every flush.
+    """
+
+    if config['cache_queries']:
+        config.mem.reduce_size()
+
+
+def code_version(func):
+
+    """
+    Hash the compiled body of a function, including its constants, so that
+    results go stale when a query changes.
+
+    Args:
+        func (func)
+
+    Returns: str
+    """
+
+    return hashlib.sha1(marshal.dumps(func.__code__)).hexdigest()
+
+
+def call(key, version, database, revision, func, args, kwargs):
+
+    """
+    Run a cached function. Only the key, code version, database, revision
+    and arguments are hashed.
+
+    Args:
+        key (str)
+        version (str)
+        database (str)
+        revision (int)
+        func (func)
+        args (tuple)
+        kwargs (dict)
+    """
+
+    return func(*args, **kwargs)
+
+
+def memoized_call():
+
+    """
+    Wrap `call` with config.mem, once per Memory instance.
+
+    Returns: func
+    """
+
+    global memo
+
+    if memo[0] is not config.mem:
+        memo = (config.mem, config.mem.cache(call, ignore=['func']))
+
+    return memo[1]
+
+
+def cached(func):
+
+    """
+    Memoize a query with config.mem, when `cache_queries` is enabled.
+    Results are keyed by the arguments, the function's code and the
+    database revision.
+
+    Args:
+        func (func)
+
+    Returns: func
+    """
+
+    key = '{}.{}'.format(func.__module__, func.__qualname__)
+
+    version = code_version(func)
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+
+        if not config['cache_queries']:
+            return func(*args, **kwargs)
+
+        return memoized_call()(
+            key, version, config['database'], db_revision(), func, args,
+            kwargs,
+        )
+
+    return wrapper
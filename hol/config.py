@@ -10,6 +10,8 @@ from wordfreq import top_n_list
 from contextlib import contextmanager
 from joblib import Memory
 
+from .vocabulary import Vocabulary
+
 
 class Config:
 
@@ -68,6 +70,9 @@ class Config:
         # Canonical set of tokens.
         self.tokens = self.build_tokens()
 
+        # Token -> integer id map.
+        self.vocab = self.build_vocab()
+
         # SQLAlchemy session maker.
         self.Session = self.build_sessionmaker()
 
@@ -88,6 +93,17 @@ class Config:
         return set(tokens)
 
 
+    def build_vocab(self):
+
+        """
+        Index the whitelisted tokens.
+
+        Returns: Vocabulary
+        """
+
+        return Vocabulary(self.tokens, self['token_cache_size'])
+
+
     def build_engine(self):
 
         """
@@ -118,7 +134,11 @@ class Config:
         Returns: Memory
         """
 
-        return Memory(cachedir=self['cache_dir'])
+        return Memory(
+            cachedir=self['cache_dir'],
+            bytes_limit=self['cache_bytes_limit'],
+            verbose=0,
+        )
 
 
     @contextmanager
@@ -4,6 +4,7 @@ import scandir
 import os
 
 from hol import config
+from hol.models import Manifest
 from hol.volume import Volume
 from hol.utils import grouper
 
@@ -35,6 +36,10 @@ class Corpus:
 
         self.path = os.path.abspath(path)
 
+        self._has_manifest = None
+
+        self.manifest_count = None
+
 
     def __len__(self):
 
@@ -44,13 +49,61 @@ class Corpus:
         Returns: int
         """
 
-        return len(list(self.paths))
+        if self.has_manifest():
+            return self.manifest_count
+
+        return sum(1 for _ in self.walk())
+
+
+    def has_manifest(self):
+
+        """
+        Has a manifest been indexed for the corpus? Checked once per instance,
+        without touching the tree; use stale_paths() to validate it.
+
+        Returns: bool
+        """
+
+        if self._has_manifest is None:
+
+            self.manifest_count = Manifest.volume_count(self.path)
+
+            self._has_manifest = bool(self.manifest_count)
+
+        return self._has_manifest
+
+
+    def stale_paths(self):
+
+        """
+        Compare the manifest with the tree. Walks and stats every file, so
+        this is an explicit check, not something jobs run on startup.
+
+        Returns: list, paths that were added, removed, or changed (size or
+            mtime) since the manifest was indexed.
+        """
+
+        recorded = Manifest.stats(self.path)
+
+        stale = []
+
+        for path in self.walk():
+
+            stat = os.stat(path)
+
+            if recorded.pop(path, None) != (stat.st_size, stat.st_mtime):
+                stale.append(path)
 
+        # Rows for files that are gone.
+        stale += recorded.keys()
 
-    def paths(self):
+        return sorted(stale)
+
+
+    def walk(self):
 
         """
-        Generate asset paths.
+        Generate asset paths from the directory tree.
 
         Yields: str
         """
@@ -60,7 +113,34 @@ class Corpus:
                 yield os.path.join(root, name)
 
 
-    def path_groups(self, n=1000):
+    def paths(self, language=None, year1=None, year2=None):
+
+        """
+        Generate asset paths. If a manifest has been indexed, read paths from
+        the database and apply the metadata filters; otherwise, walk the tree.
+
+        Args:
+            language (str)
+            year1 (int)
+            year2 (int)
+
+        Yields: str
+        """
+
+        if self.has_manifest():
+
+            yield from Manifest.paths(
+                self.path,
+                language=language,
+                year1=year1,
+                year2=year2,
+            )
+
+        else:
+            yield from self.walk()
+
+
+    def path_groups(self, n=1000, *args, **kwargs):
 
         """
         Generate groups of paths.
@@ -68,7 +148,7 @@ class Corpus:
         Yields: list
         """
 
-        for group in grouper(self.paths(), n):
+        for group in grouper(self.paths(*args, **kwargs), n):
             yield group
 
 
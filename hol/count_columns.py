@@ -0,0 +1,163 @@
+
+
+import os
+import json
+import numpy as np
+
+from numpy.lib.format import open_memmap
+
+from hol import config
+
+
+class CountColumns:
+
+
+    # Table -> (column, SQL expression, dtype)
+    tables = {
+
+        'count': (
+            ('token_id', 'token_id', np.int32),
+            ('year', 'year', np.int32),
+            ('count', 'count', np.int64),
+        ),
+
+        'anchored_count': (
+            ('anchor_id', 'anchor', np.int32),
+            ('page_size', 'page_size', np.int32),
+            ('year', 'year', np.int32),
+            ('level', 'anchor_count', np.int32),
+            ('token_id', 'token_id', np.int32),
+            ('count', 'count', np.int64),
+        ),
+
+    }
+
+
+    @classmethod
+    def export(cls, path, batch_size=1000000):
+
+        """
+        Dump the count tables into one .npy file per column, plus the token
+        and anchor vocabularies. Rows are in no particular order.
+
+        Args:
+            path (str)
+            batch_size (int)
+
+        Returns: cls
+        """
+
+        with config.get_session() as session:
+
+            cursor = session.connection().connection.cursor()
+
+            # Token strings, indexed by id.
+            cursor.execute('SELECT max(id) FROM token')
+
+            tokens = [None] * ((cursor.fetchone()[0] or 0) + 1)
+
+            for tid, token in cursor.execute('SELECT id, token FROM token'):
+                tokens[tid] = token
+
+            cursor.execute('SELECT DISTINCT anchor FROM anchored_count')
+
+            anchors = sorted(r[0] for r in cursor.fetchall())
+
+            anchor_ids = {a: i for i, a in enumerate(anchors)}
+
+            for table, columns in cls.tables.items():
+
+                root = os.path.join(path, table)
+
+                os.makedirs(root, exist_ok=True)
+
+                cursor.execute('SELECT count(*) FROM {}'.format(table))
+
+                n = cursor.fetchone()[0]
+
+                arrays = [
+                    open_memmap(
+                        os.path.join(root, name+'.npy'),
+                        mode='w+', dtype=dtype, shape=(n,),
+                    )
+                    for name, _, dtype in columns
+                ]
+
+                # Scan order - sorting would build a temp B-tree.
+                cursor.execute('SELECT {} FROM {}'.format(
+                    ', '.join(expr for _, expr, _ in columns), table,
+                ))
+
+                i = 0
+                while True:
+
+                    batch = cursor.fetchmany(batch_size)
+
+                    if not batch:
+                        break
+
+                    values = list(zip(*batch))
+
+                    for j, (name, _, _) in enumerate(columns):
+
+                        if name == 'anchor_id':
+                            values[j] = [anchor_ids[a] for a in values[j]]
+
+                        arrays[j][i:i+len(batch)] = values[j]
+
+                    i += len(batch)
+
+                for array in arrays:
+                    array.flush()
+
+        with open(os.path.join(path, 'tokens.json'), 'w') as fh:
+            json.dump(tokens, fh)
+
+        with open(os.path.join(path, 'anchors.json'), 'w') as fh:
+            json.dump(anchors, fh)
+
+        return cls(path)
+
+
+    def __init__(self, path):
+
+        """
+        Memory-map the columns.
+
+        Args:
+            path (str)
+        """
+
+        self.path = os.path.abspath(path)
+
+        with open(os.path.join(self.path, 'tokens.json')) as fh:
+            self.tokens = json.load(fh)
+
+        with open(os.path.join(self.path, 'anchors.json')) as fh:
+            self.anchors = json.load(fh)
+
+        for table, columns in self.tables.items():
+
+            arrays = {
+                name: np.load(
+                    os.path.join(self.path, table, name+'.npy'),
+                    mmap_mode='r',
+                )
+                for name, _, _ in columns
+            }
+
+            setattr(self, table, arrays)
+
+
+    def token_ids(self):
+
+        """
+        Map token -> id.
+
+        Returns: dict {token: id, ...}
+        """
+
+        return {
+            t: i for i, t in enumerate(self.tokens)
+            if t is not None
+        }
@@ -1,7 +1,5 @@
 
 
-from collections import OrderedDict
-
 from hol.models import Count
 from hol.wpm import WPM
 
@@ -19,16 +17,4 @@ class CountWPM(WPM):
             year2 (int)
         """
 
-        self.wpms = OrderedDict()
-
-        totals = Count.year_count_series(year1, year2)
-
-        for year in totals.keys():
-
-            counts = Count.token_counts_by_year(year, year)
-
-            wpm = {}
-            for token, count in counts.items():
-                wpm[token] = (1e6*count) / totals[year]
-
-            self.wpms[year] = wpm
+        super().__init__(Count.year_token_counts(year1, year2))
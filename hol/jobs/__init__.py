@@ -3,3 +3,5 @@
 from .base import BaseJob
 from .index_count import IndexCount
 from .index_anchored_count import IndexAnchoredCount
+from .index_manifest import IndexManifest
+from .transcode import Transcode
@@ -4,8 +4,13 @@ from datetime import datetime as dt
 from abc import ABCMeta, abstractmethod
 from mpi4py import MPI
 
+from hol import config
 from hol.corpus import Corpus
-from hol.utils import enum, mem_pct
+from hol.packed_corpus import PackedCorpus
+from hol.packed_volume import PackedVolume
+from hol.page_matrix import PageMatrix
+from hol.streaming_volume import StreamingVolume
+from hol.utils import enum, mem_pct, grouper
 
 
 Tags = enum('READY', 'WORK', 'RESULT', 'EXIT')
@@ -34,16 +39,153 @@ class BaseJob(metaclass=ABCMeta):
         pass
 
 
-    def __init__(self, group_size=1000):
+    def __init__(self, group_size=1000, source='raw'):
 
         """
         Set the path group size.
 
         Args:
             group_size (int)
+            source (str): raw (JSON), packed (shards), or matrix.
         """
 
         self.group_size = group_size
+        self.source = source
+
+        self.matrix = None
+
+
+    def path_groups(self):
+
+        """
+        Generate path groups from the corpus. If a manifest is available, skip
+        non-English volumes without opening the files. For the page matrix,
+        the "paths" are volume indexes.
+
+        Returns: iter
+        """
+
+        if self.source == 'packed':
+            corpus = PackedCorpus.from_env()
+            corpus.check_vocab()
+            return corpus.path_groups(self.group_size)
+
+        if self.source == 'matrix':
+            matrix = PageMatrix.from_env()
+            matrix.check_vocab()
+            return grouper(range(len(matrix)), self.group_size)
+
+        corpus = Corpus.from_env()
+
+        return corpus.path_groups(self.group_size, language='eng')
+
+
+    def accept(self, vol):
+
+        """
+        Should a volume be indexed? Only reads header fields.
+
+        Args:
+            vol (Volume)
+
+        Returns: bool
+        """
+
+        return vol.is_english and vol.has_year
+
+
+    def volumes(self, paths):
+
+        """
+        Generate the volumes in a group of paths that pass the filter.
+
+        Args:
+            paths (list)
+
+        Returns: iter
+        """
+
+        if self.source == 'packed':
+            return self.packed_volumes(paths)
+
+        elif self.source == 'matrix':
+            return self.matrix_volumes(paths)
+
+        else:
+            return self.raw_volumes(paths)
+
+
+    def raw_volumes(self, paths):
+
+        """
+        Read the header of each volume, skip the ones that fail the filter
+        before any page data is inflated.
+
+        Args:
+            paths (list)
+
+        Yields: StreamingVolume
+        """
+
+        for path in paths:
+
+            try:
+
+                vol = StreamingVolume.from_path(path)
+
+                if self.accept(vol):
+                    yield vol
+
+                # Release the archive, the pages won't be read.
+                else:
+                    vol.close()
+
+            except Exception as e:
+                print(e)
+
+
+    def packed_volumes(self, paths):
+
+        """
+        Read volumes from a group of shards.
+
+        Args:
+            paths (list)
+
+        Yields: PackedVolume
+        """
+
+        for path in paths:
+
+            try:
+                for vol in PackedVolume.read_shard(path):
+                    if self.accept(vol):
+                        yield vol
+
+            except Exception as e:
+                print(e)
+
+
+    def matrix_volumes(self, indexes):
+
+        """
+        Wrap row slices of the page matrix.
+
+        Args:
+            indexes (list): Volume indexes.
+
+        Yields: PackedVolume
+        """
+
+        if not self.matrix:
+            self.matrix = PageMatrix.from_env()
+
+        for i in indexes:
+
+            vol = self.matrix.volume(i)
+
+            if self.accept(vol):
+                yield vol
 
 
     def run(self):
@@ -67,9 +209,7 @@ class BaseJob(metaclass=ABCMeta):
         i = 0
         if rank == 0:
 
-            corpus = Corpus.from_env()
-
-            path_groups = corpus.path_groups(self.group_size)
+            path_groups = self.path_groups()
 
             closed = 0
             while closed < size-1:
@@ -135,7 +275,10 @@ class BaseJob(metaclass=ABCMeta):
                 if tag == Tags.WORK:
                     self.process(paths)
                     comm.send(None, dest=0, tag=Tags.RESULT)
-                    print(rank, 'result', mem_pct())
+                    print(
+                        rank, 'result', mem_pct(),
+                        config.vocab.cache_info(),
+                    )
 
                 # Or, no paths, exit.
                 elif tag == Tags.EXIT:
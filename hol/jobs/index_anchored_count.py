@@ -1,32 +1,68 @@
 
 
-from collections import defaultdict, Counter
+from collections import defaultdict
 
 from hol import config
 from hol.jobs import BaseJob
 from hol.models import AnchoredCount
-from hol.volume import Volume
+from hol.utils import flatten_dict, sparse_add
 
 
 class IndexAnchoredCount(BaseJob):
 
 
-    def __init__(self, anchor, page_size=1000, *args, **kwargs):
+    def __init__(self, anchors, page_sizes=(1000,), *args, **kwargs):
 
         """
-        Set the anchor token.
+        Set the anchor tokens and page group sizes.
 
         Args:
-            anchor (str)
-            page_size (int)
+            anchors (list<str>)
+            page_sizes (list<int>)
         """
 
         super().__init__(*args, **kwargs)
 
-        self.anchor = anchor
-        self.page_size = page_size
+        anchors = list(anchors)
+
+        unknown = [a for a in anchors if a not in config.vocab]
+
+        # Fail fast, instead of on every volume.
+        if unknown:
+            raise ValueError('Anchors not in the vocabulary: {}'.format(
+                ', '.join(unknown),
+            ))
+
+        self.anchors = anchors
+        self.page_sizes = list(page_sizes)
+
+        # page size -> anchor -> year -> level -> (ids, counts)
+        self.data = {
+            size: {anchor: defaultdict(dict) for anchor in self.anchors}
+            for size in self.page_sizes
+        }
+
+
+    def add(self, size, anchor, year, level, pair):
+
+        """
+        Add a sparse (ids, counts) pair onto a level.
+
+        Args:
+            size (int)
+            anchor (str)
+            year (int)
+            level (int)
+            pair (tuple)
+        """
+
+        levels = self.data[size][anchor][year]
 
-        self.data = defaultdict(lambda: defaultdict(Counter))
+        if level in levels:
+            levels[level] = sparse_add(levels[level], pair)
+
+        else:
+            levels[level] = pair
 
 
     def process(self, paths):
@@ -37,24 +73,20 @@ class IndexAnchoredCount(BaseJob):
         Args:
             paths (list)
 
-        Returns: defaultdict(Counter)
+        Returns: dict
         """
 
-        for path in paths:
+        for vol in self.volumes(paths):
 
             try:
 
-                vol = Volume.from_path(path)
-
-                if vol.is_english:
-
-                    counts = vol.anchored_token_counts(
-                        self.anchor,
-                        self.page_size,
-                    )
+                arrays = vol.anchored_token_arrays(
+                    self.anchors,
+                    self.page_sizes,
+                )
 
-                    for level, counts in counts.items():
-                        self.data[vol.year][level] += counts
+                for size, anchor, level, pair in flatten_dict(arrays):
+                    self.add(size, anchor, vol.year, level, pair)
 
             except Exception as e:
                 print(e)
@@ -63,12 +95,21 @@ class IndexAnchoredCount(BaseJob):
     def shrinkwrap(self):
 
         """
-        Format the counters for MPI.
+        Format the sparse counts for MPI.
 
         Returns: dict
         """
 
-        return dict(self.data)
+        return {
+            size: {
+                anchor: {
+                    year: dict(levels)
+                    for year, levels in years.items()
+                }
+                for anchor, years in anchors.items()
+            }
+            for size, anchors in self.data.items()
+        }
 
 
     def merge(self, data):
@@ -80,9 +121,8 @@ class IndexAnchoredCount(BaseJob):
             data (dict)
         """
 
-        for year, level_counts in data.items():
-            for level, counts in level_counts.items():
-                self.data[year][level] += counts
+        for size, anchor, year, level, pair in flatten_dict(data):
+            self.add(size, anchor, year, level, pair)
 
 
     def flush(self):
@@ -91,4 +131,16 @@ class IndexAnchoredCount(BaseJob):
         Increment database counters.
         """
 
-        AnchoredCount.flush(self.data)
+        AnchoredCount.flush({
+            size: {
+                anchor: {
+                    year: {
+                        level: config.vocab.sparse_counts(pair)
+                        for level, pair in levels.items()
+                    }
+                    for year, levels in years.items()
+                }
+                for anchor, years in anchors.items()
+            }
+            for size, anchors in self.data.items()
+        })
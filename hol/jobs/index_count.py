@@ -1,10 +1,9 @@
 
 
-from collections import defaultdict, Counter
+from collections import defaultdict
 
 from hol import config
 from hol.jobs import BaseJob
-from hol.volume import Volume
 from hol.models import Count
 
 
@@ -14,12 +13,12 @@ class IndexCount(BaseJob):
     def __init__(self, *args, **kwargs):
 
         """
-        Initialize the merged counter.
+        Initialize the merged count arrays.
         """
 
         super().__init__(*args, **kwargs)
 
-        self.data = defaultdict(Counter)
+        self.data = defaultdict(config.vocab.zeros)
 
 
     def process(self, paths):
@@ -30,17 +29,13 @@ class IndexCount(BaseJob):
         Args:
             paths (list)
 
-        Returns: defaultdict(Counter)
+        Returns: defaultdict(np.array)
         """
 
-        for i, path in enumerate(paths):
+        for vol in self.volumes(paths):
 
             try:
-
-                vol = Volume.from_path(path)
-
-                if vol.is_english:
-                    self.data[vol.year] += vol.token_counts()
+                self.data[vol.year] += vol.token_array()
 
             except Exception as e:
                 print(e)
@@ -49,7 +44,7 @@ class IndexCount(BaseJob):
     def shrinkwrap(self):
 
         """
-        Format the counters for MPI.
+        Format the count arrays for MPI.
 
         Returns: dict
         """
@@ -76,4 +71,7 @@ class IndexCount(BaseJob):
         Increment database counters.
         """
 
-        Count.flush(self.data)
+        Count.flush({
+            year: config.vocab.counts(counts)
+            for year, counts in self.data.items()
+        })
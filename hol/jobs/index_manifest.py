@@ -0,0 +1,101 @@
+
+
+import os
+
+from hol.corpus import Corpus
+from hol.jobs import BaseJob
+from hol.models import Manifest
+from hol.streaming_volume import StreamingVolume
+from hol.utils import grouper
+
+
+class IndexManifest(BaseJob):
+
+
+    def __init__(self, *args, **kwargs):
+
+        """
+        Initialize the volume rows.
+        """
+
+        super().__init__(*args, **kwargs)
+
+        self.rows = []
+
+
+    def path_groups(self):
+
+        """
+        Walk the directory tree, since the manifest is being (re)built.
+
+        Returns: iter
+        """
+
+        corpus = Corpus.from_env()
+
+        return grouper(corpus.walk(), self.group_size)
+
+
+    def process(self, paths):
+
+        """
+        Read the header and file stats for a set of paths.
+
+        Args:
+            paths (list)
+        """
+
+        for path in paths:
+
+            try:
+
+                stat = os.stat(path)
+
+                # Only the header is needed, close the archive right away.
+                with StreamingVolume.from_path(path) as vol:
+
+                    self.rows.append(dict(
+                        path=path,
+                        htrc_id=vol.id,
+                        year=vol.year if vol.has_year else None,
+                        language=vol.language,
+                        size=stat.st_size,
+                        mtime=stat.st_mtime,
+                    ))
+
+            except Exception as e:
+                print(e)
+
+
+    def shrinkwrap(self):
+
+        """
+        Send the rows back to rank 0.
+
+        Returns: list
+        """
+
+        return self.rows
+
+
+    def merge(self, rows):
+
+        """
+        Merge in the rows from a rank.
+
+        Args:
+            rows (list)
+        """
+
+        self.rows += rows
+
+
+    def flush(self):
+
+        """
+        Write the manifest, and drop the rows of deleted files.
+        """
+
+        Manifest.flush(self.rows)
+
+        Manifest.prune(Corpus.from_env().path)
@@ -0,0 +1,112 @@
+
+
+import os
+import uuid
+import shutil
+
+from hol.jobs import BaseJob
+from hol.packed_corpus import PackedCorpus
+from hol.packed_volume import PackedVolume
+
+
+class Transcode(BaseJob):
+
+
+    def __init__(self, *args, **kwargs):
+
+        """
+        Initialize the volume counter.
+        """
+
+        super().__init__(*args, **kwargs)
+
+        self.count = 0
+
+
+    def path_groups(self):
+
+        """
+        Start from an empty staging directory, so that shards left over from
+        an earlier run never end up in the new corpus. Called once, on rank
+        0, before any paths are dispatched.
+
+        Returns: iter
+        """
+
+        corpus = PackedCorpus.from_env()
+
+        shutil.rmtree(corpus.staging_path, ignore_errors=True)
+        os.makedirs(corpus.staging_path)
+
+        return super().path_groups()
+
+
+    def process(self, paths):
+
+        """
+        Pack a group of volumes into a shard file.
+
+        Args:
+            paths (list)
+        """
+
+        corpus = PackedCorpus.from_env()
+
+        path = os.path.join(corpus.staging_path, uuid.uuid4().hex+'.bin')
+
+        count = 0
+
+        with open(path, 'wb') as fh:
+            for vol in self.raw_volumes(paths):
+
+                try:
+                    PackedVolume.from_volume(vol).write(fh)
+                    count += 1
+
+                except Exception as e:
+                    print(e)
+
+        if not count:
+            os.remove(path)
+
+        self.count += count
+
+
+    def shrinkwrap(self):
+
+        """
+        Send the volume count back to rank 0.
+
+        Returns: int
+        """
+
+        return self.count
+
+
+    def merge(self, count):
+
+        """
+        Add up the volume counts.
+
+        Args:
+            count (int)
+        """
+
+        self.count += count
+
+
+    def flush(self):
+
+        """
+        Save the vocabulary that the shards were packed with, then swap the
+        staging directory in for the old corpus.
+        """
+
+        corpus = PackedCorpus.from_env()
+
+        PackedCorpus(corpus.staging_path).write_vocab()
+
+        shutil.rmtree(corpus.path, ignore_errors=True)
+        os.rename(corpus.staging_path, corpus.path)
+
+        print(self.count, 'volumes')
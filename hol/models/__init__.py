@@ -1,5 +1,9 @@
 
 
 from .base import BaseModel
+from .token import Token
+from .count_total import CountTotal
+from .anchored_count_total import AnchoredCountTotal
 from .count import Count
 from .anchored_count import AnchoredCount
+from .manifest import Manifest
@@ -3,19 +3,18 @@
 import numpy as np
 
 from functools import partial
-from scipy.stats import chi2_contingency
 from collections import OrderedDict
 
-from sqlalchemy import Column, Integer, String, \
+from sqlalchemy import Column, Integer, String, ForeignKey, \
         PrimaryKeyConstraint, distinct
+from sqlalchemy.schema import Index
 
-from sqlalchemy.sql import text, func
+from sqlalchemy.sql import func
 
 from hol import config
-from hol.models import BaseModel, Count
-from hol.utils import flatten_dict, sort_dict
-from hol.corpus import Corpus
-from hol.volume import Volume
+from hol.cache import cached
+from hol.models import BaseModel, Token, Count, AnchoredCountTotal
+from hol.utils import flatten_dict, contingency_scores
 
 
 
@@ -25,10 +24,29 @@ class AnchoredCount(BaseModel):
     __tablename__ = 'anchored_count'
 
     __table_args__ = (
-        PrimaryKeyConstraint('token', 'year', 'anchor_count'),
+        PrimaryKeyConstraint(
+            'anchor',
+            'page_size',
+            'token_id',
+            'year',
+            'anchor_count',
+        ),
+        Index(
+            'anchored_count_year_level',
+            'year',
+            'anchor_count',
+            'anchor',
+            'page_size',
+            'token_id',
+            'count',
+        ),
     )
 
-    token = Column(String, nullable=False)
+    anchor = Column(String, nullable=False)
+
+    page_size = Column(Integer, nullable=False)
+
+    token_id = Column(Integer, ForeignKey('token.id'), nullable=False)
 
     year = Column(Integer, nullable=False)
 
@@ -36,6 +54,11 @@ class AnchoredCount(BaseModel):
 
     count = Column(Integer, nullable=False)
 
+    # Per-year, per-level totals, kept in sync with the counts.
+    rollups = [
+        (AnchoredCountTotal, ['page_size', 'anchor', 'year', 'anchor_count']),
+    ]
+
 
     @classmethod
     def flush(cls, counts):
@@ -44,53 +67,56 @@ class AnchoredCount(BaseModel):
         Flush a set of counts to disk.
 
         Args:
-            counts (dict): year -> level -> token -> count
+            counts (dict): page size -> anchor -> year -> level -> token ->
+                count
         """
 
-        session = config.Session()
+        cls.upsert(
+            ['page_size', 'anchor', 'year', 'anchor_count', 'token', 'count'],
+            flatten_dict(counts),
+            cls.rollups,
+        )
 
-        # SQLite "upsert."
-        query = text("""
 
-            INSERT OR REPLACE INTO {table!s} (
-                token,
-                year,
-                anchor_count,
-                count
-            )
+    @classmethod
+    def check_unique(cls, column, value):
 
-            VALUES (
-                :token,
-                :year,
-                :anchor_count,
-                :count + COALESCE(
-                    (
-                        SELECT count FROM {table!s} WHERE (
-                            token = :token AND
-                            year = :year AND
-                            anchor_count = :anchor_count
-                        )
-                    ),
-                    0
-                )
-            )
+        """
+        When a filter is left blank, make sure the table only holds one value
+        for the column. Otherwise, counts for several anchors or page sizes
+        would be summed together into a meaningless series.
+
+        Args:
+            column (str)
+            value (mixed)
+
+        Raises: ValueError
+        """
 
-        """.format(table=cls.__tablename__))
+        if value is not None:
+            return
 
-        for year, level, token, count in flatten_dict(counts):
+        with config.get_session() as session:
 
-            session.execute(query, dict(
-                token=token,
-                year=year,
-                anchor_count=level,
-                count=count,
-            ))
+            res = (
+                session
+                .query(getattr(AnchoredCountTotal, column))
+                .distinct()
+                .limit(2)
+            )
 
-        session.commit()
+            if len(res.all()) > 1:
+                raise ValueError(
+                    'Several values of {} are indexed, pass one.'.format(
+                        column,
+                    )
+                )
 
 
     @classmethod
-    def token_year_level_count(cls, token, year, level):
+    @cached
+    def token_year_level_count(cls, token, year, level, anchor=None,
+        page_size=None):
 
         """
         How many times did token X appear in year Y on pages where the anchor
@@ -100,27 +126,41 @@ class AnchoredCount(BaseModel):
             token (str)
             year (int)
             level (int)
+            anchor (str)
+            page_size (int)
 
         Returns: int
         """
 
+        cls.check_unique('anchor', anchor)
+        cls.check_unique('page_size', page_size)
+
         with config.get_session() as session:
 
             res = (
                 session
                 .query(func.sum(cls.count))
+                .select_from(cls)
+                .join(Token, Token.id==cls.token_id)
                 .filter(
-                    cls.token==token,
+                    Token.token==token,
                     cls.year==year,
                     cls.anchor_count==level,
                 )
             )
 
+            if anchor:
+                res = res.filter(cls.anchor==anchor)
+
+            if page_size:
+                res = res.filter(cls.page_size==page_size)
+
             return res.scalar() or 0
 
 
     @classmethod
-    def year_count_series(cls, year1, year2):
+    @cached
+    def year_count_series(cls, year1, year2, anchor=None, page_size=None):
 
         """
         Get total token counts for a range of years.
@@ -128,26 +168,159 @@ class AnchoredCount(BaseModel):
         Args:
             year1 (int)
             year2 (int)
+            anchor (str)
+            page_size (int)
 
         Returns: OrderedDict {year: count, ...}
         """
 
+        cls.check_unique('anchor', anchor)
+        cls.check_unique('page_size', page_size)
+
+        total = AnchoredCountTotal
+
         with config.get_session() as session:
 
             res = (
                 session
-                .query(cls.year, func.sum(cls.count))
-                .filter(cls.year >= year1, cls.year <= year2)
-                .group_by(cls.year)
-                .order_by(cls.year)
+                .query(total.year, func.sum(total.count))
+                .filter(total.year >= year1, total.year <= year2)
             )
 
+            if anchor:
+                res = res.filter(total.anchor==anchor)
+
+            if page_size:
+                res = res.filter(total.page_size==page_size)
+
+            res = res.group_by(total.year).order_by(total.year)
+
             return OrderedDict(res.all())
 
 
     @classmethod
+    @cached
+    def year_token_counts(cls, year1, year2, anchor=None, page_size=None):
+
+        """
+        Get (year, token, count) rows for a range of years, summed across
+        levels, in one query.
+
+        Args:
+            year1 (int)
+            year2 (int)
+            anchor (str)
+            page_size (int)
+
+        Returns: list [(year, token, count), ...]
+        """
+
+        cls.check_unique('anchor', anchor)
+        cls.check_unique('page_size', page_size)
+
+        with config.get_session() as session:
+
+            res = (
+                session
+                .query(cls.year, Token.token, func.sum(cls.count))
+                .join(Token, Token.id==cls.token_id)
+                .filter(cls.year >= year1, cls.year <= year2)
+            )
+
+            if anchor:
+                res = res.filter(cls.anchor==anchor)
+
+            if page_size:
+                res = res.filter(cls.page_size==page_size)
+
+            res = res.group_by(cls.year, cls.token_id)
+
+            return res.all()
+
+
+    @classmethod
+    @cached
+    def year_level_token_counts(cls, year1, year2, anchor=None,
+        page_size=None):
+
+        """
+        Get (year, level, token, count) rows for a range of years, in one
+        query.
+
+        Args:
+            year1 (int)
+            year2 (int)
+            anchor (str)
+            page_size (int)
+
+        Returns: list [(year, level, token, count), ...]
+        """
+
+        cls.check_unique('anchor', anchor)
+        cls.check_unique('page_size', page_size)
+
+        with config.get_session() as session:
+
+            res = (
+                session
+                .query(
+                    cls.year,
+                    cls.anchor_count,
+                    Token.token,
+                    func.sum(cls.count),
+                )
+                .join(Token, Token.id==cls.token_id)
+                .filter(cls.year >= year1, cls.year <= year2)
+            )
+
+            if anchor:
+                res = res.filter(cls.anchor==anchor)
+
+            if page_size:
+                res = res.filter(cls.page_size==page_size)
+
+            res = res.group_by(cls.year, cls.anchor_count, cls.token_id)
+
+            return res.all()
+
+
+    @classmethod
+    @cached
+    def max_level(cls, anchor=None, page_size=None):
+
+        """
+        Get the highest anchor count.
+
+        Args:
+            anchor (str)
+            page_size (int)
+
+        Returns: int
+        """
+
+        cls.check_unique('anchor', anchor)
+        cls.check_unique('page_size', page_size)
+
+        total = AnchoredCountTotal
+
+        with config.get_session() as session:
+
+            query = session.query(func.max(total.anchor_count))
+
+            if anchor:
+                query = query.filter(total.anchor==anchor)
+
+            if page_size:
+                query = query.filter(total.page_size==page_size)
+
+            return query.scalar() or 0
+
+
+    @classmethod
+    @cached
     def token_counts_by_year_and_level(cls, year1=None, year2=None,
-        level1=None, level2=None):
+        level1=None, level2=None, anchor=None, page_size=None,
+        min_count=None):
 
         """
         Given a year and level (or a range of either), map token -> count for
@@ -158,13 +331,24 @@ class AnchoredCount(BaseModel):
             year2 (int)
             level1 (int)
             level2 (int)
+            anchor (str)
+            page_size (int)
+            min_count (int): Skip tokens with fewer total occurrences.
 
         Returns: dict {token: count, ...}
         """
 
+        cls.check_unique('anchor', anchor)
+        cls.check_unique('page_size', page_size)
+
         with config.get_session() as session:
 
-            query = session.query(cls.token, func.sum(cls.count))
+            query = (
+                session
+                .query(Token.token, func.sum(cls.count))
+                .select_from(cls)
+                .join(Token, Token.id==cls.token_id)
+            )
 
             if year1:
                 query = query.filter(cls.year >= year1)
@@ -178,14 +362,24 @@ class AnchoredCount(BaseModel):
             if level2:
                 query = query.filter(cls.anchor_count <= level2)
 
-            res = query.group_by(cls.token)
+            if anchor:
+                query = query.filter(cls.anchor==anchor)
+
+            if page_size:
+                query = query.filter(cls.page_size==page_size)
+
+            res = query.group_by(cls.token_id)
+
+            if min_count:
+                res = res.having(func.sum(cls.count) >= min_count)
 
             return dict(res.all())
 
 
     @classmethod
+    @cached
     def total_count_by_year_and_level(cls, year1=None, year2=None,
-        level1=None, level2=None):
+        level1=None, level2=None, anchor=None, page_size=None):
 
         """
         Given a year and level (or a range of either), get the total number of
@@ -196,32 +390,47 @@ class AnchoredCount(BaseModel):
             year2 (int)
             level1 (int)
             level2 (int)
+            anchor (str)
+            page_size (int)
 
         Returns: int
         """
 
+        cls.check_unique('anchor', anchor)
+        cls.check_unique('page_size', page_size)
+
+        total = AnchoredCountTotal
+
         with config.get_session() as session:
 
-            query = session.query(func.sum(cls.count))
+            query = session.query(func.sum(total.count))
 
             if year1:
-                query = query.filter(cls.year >= year1)
+                query = query.filter(total.year >= year1)
 
             if year2:
-                query = query.filter(cls.year <= year2)
+                query = query.filter(total.year <= year2)
 
             if level1:
-                query = query.filter(cls.anchor_count >= level1)
+                query = query.filter(total.anchor_count >= level1)
 
             if level2:
-                query = query.filter(cls.anchor_count <= level2)
+                query = query.filter(total.anchor_count <= level2)
+
+            if anchor:
+                query = query.filter(total.anchor==anchor)
+
+            if page_size:
+                query = query.filter(total.page_size==page_size)
 
             return query.scalar() or 0
 
 
 
     @classmethod
-    def mdw(cls, year1=None, year2=None, level1=None, level2=None):
+    @cached
+    def mdw(cls, year1=None, year2=None, level1=None, level2=None,
+        anchor=None, page_size=None, metric='g', k=None, min_count=None):
 
         """
         Given a range of years and levels, get a ranking of tokens in terms of
@@ -232,29 +441,47 @@ class AnchoredCount(BaseModel):
             year2 (int)
             level1 (int)
             level2 (int)
+            anchor (str)
+            page_size (int)
+            metric (str): 'g', 'log_ratio', or 'pmi'.
+            k (int): Just return the top k tokens.
+            min_count (int): Skip tokens with fewer anchored occurrences.
 
         Returns: OrderedDict {token: score, ...}
         """
 
-        a = cls.token_counts_by_year_and_level(year1, year2, level1, level2)
+        cls.check_unique('anchor', anchor)
+        cls.check_unique('page_size', page_size)
+
+        a = cls.token_counts_by_year_and_level(
+            year1, year2, level1, level2, anchor, page_size, min_count,
+        )
 
         b = Count.token_counts_by_year(year1, year2)
 
-        c = cls.total_count_by_year_and_level(year1, year2, level1, level2)
+        c = cls.total_count_by_year_and_level(
+            year1, year2, level1, level2, anchor, page_size,
+        )
 
         d = Count.total_count_by_year(year1, year2)
 
-        topn = dict()
+        tokens = list(a.keys())
 
-        for token in a.keys():
+        # Align the per-token counts, and score all tables at once.
+        a = np.array([a[t] for t in tokens], dtype=float)
+        b = np.array([b[t] for t in tokens], dtype=float)
 
-            rc = np.array([
-                [a[token], b[token]-a[token]],
-                [c, d-c],
-            ])
+        scores = contingency_scores(a, b-a, c, d-c, [metric])[metric]
 
-            g, _, _, _ = chi2_contingency(rc, lambda_='log-likelihood')
+        # Select the top k before sorting, when requested.
+        if k is not None and k < len(scores):
+            idx = np.argpartition(-scores, k)[:k]
+        else:
+            idx = np.arange(len(scores))
 
-            topn[token] = g
+        idx = idx[np.argsort(-scores[idx], kind='mergesort')]
 
-        return sort_dict(topn)
+        return OrderedDict([
+            (tokens[i], scores[i].item())
+            for i in idx
+        ])
@@ -0,0 +1,31 @@
+
+
+from sqlalchemy import Column, Integer, String, PrimaryKeyConstraint
+
+from hol.models import BaseModel
+
+
+
+class AnchoredCountTotal(BaseModel):
+
+
+    __tablename__ = 'anchored_count_total'
+
+    __table_args__ = (
+        PrimaryKeyConstraint(
+            'year',
+            'anchor_count',
+            'anchor',
+            'page_size',
+        ),
+    )
+
+    anchor = Column(String, nullable=False)
+
+    page_size = Column(Integer, nullable=False)
+
+    year = Column(Integer, nullable=False)
+
+    anchor_count = Column(Integer, nullable=False)
+
+    count = Column(Integer, nullable=False)
@@ -1,6 +1,277 @@
 
 
+from itertools import chain
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session
 from sqlalchemy.ext.declarative import declarative_base
 
+from hol import config
+from hol.cache import bump_revision, reduce_cache
+
+
+class Base:
+
+
+    # (model, columns) total tables kept in sync with the table.
+    rollups = ()
+
+
+    @classmethod
+    def upsert(cls, columns, rows, rollups=()):
+
+        """
+        Add a stream of counts onto the table in bulk. Rows are staged in a
+        temporary table with executemany, and then summed into the table with
+        a single grouped upsert.
+
+        Args:
+            columns (list): Column names; the last is the summed value. A
+                "token" column is stored as "token_id".
+            rows (iter): Tuples of values, in the same order.
+            rollups (iter): (model, columns) total tables to keep in sync.
+        """
+
+        with config.get_session() as session:
+
+            cursor = session.connection().connection.cursor()
+
+            table = cls.__tablename__
+
+            stage = '{}_stage'.format(table)
+
+            keys = columns[:-1]
+            value = columns[-1]
+
+            cursor.execute('DROP TABLE IF EXISTS temp.{}'.format(stage))
+
+            cursor.execute('CREATE TEMP TABLE {} ({})'.format(
+                stage, ', '.join(columns),
+            ))
+
+            cursor.executemany(
+                'INSERT INTO temp.{} VALUES ({})'.format(
+                    stage, ', '.join('?' * len(columns)),
+                ),
+                rows,
+            )
+
+            source = 'temp.'+stage
+
+            # Swap token strings for ids from the token table.
+            if 'token' in keys:
+
+                cursor.execute("""
+                    INSERT OR IGNORE INTO token (token)
+                    SELECT DISTINCT token FROM temp.{}
+                """.format(stage))
+
+                select = ', '.join([
+                    'token.id AS token_id' if c == 'token' else 's.'+c
+                    for c in columns
+                ])
+
+                source = """(
+                    SELECT {select} FROM temp.{stage} AS s
+                    JOIN token ON token.token = s.token
+                )""".format(select=select, stage=stage)
+
+                keys = ['token_id' if k == 'token' else k for k in keys]
+
+            tables = [table] + [model.__tablename__ for model, _ in rollups]
+
+            cls.merge(cursor, source, table, keys, value)
+
+            # Add the same rows onto the totals.
+            for model, rollup_keys in rollups:
+                cls.merge(
+                    cursor, 'temp.'+stage, model.__tablename__, rollup_keys,
+                    value,
+                )
+
+            cursor.execute('DROP TABLE temp.{}'.format(stage))
+
+            # Refresh planner statistics for the indexes.
+            for name in tables:
+                cursor.execute('ANALYZE {}'.format(name))
+
+            bump_revision(cursor)
+
+        reduce_cache()
+
+
+    @classmethod
+    def rollup(cls, model, keys, value='count'):
+
+        """
+        Rebuild a total table from scratch.
+
+        Args:
+            model (BaseModel): The total table.
+            keys (list): Columns to group by.
+            value (str): The summed column.
+        """
+
+        with config.get_session() as session:
+
+            cursor = session.connection().connection.cursor()
+
+            cursor.execute('DELETE FROM {}'.format(model.__tablename__))
+
+            cls.merge(
+                cursor, cls.__tablename__, model.__tablename__, keys, value,
+            )
+
+            bump_revision(cursor)
+
+        reduce_cache()
+
+
+    @classmethod
+    def rebuild_totals(cls):
+
+        """
+        Recompute the total tables from scratch.
+        """
+
+        for model, keys in cls.rollups:
+            cls.rollup(model, keys)
+
+
+    @classmethod
+    def add_to_totals(cls, connection, values, count):
+
+        """
+        Add a single count onto the total tables.
+
+        Args:
+            connection (Connection)
+            values (dict): Column -> value, at least the rollup keys.
+            count (int)
+        """
+
+        for model, keys in cls.rollups:
+
+            connection.execute(text("""
+
+                INSERT INTO {table} ({keys}, count)
+                VALUES ({params}, :count)
+
+                ON CONFLICT ({keys}) DO UPDATE
+                SET count = count + excluded.count
+
+            """.format(
+                table=model.__tablename__,
+                keys=', '.join(keys),
+                params=', '.join(':'+k for k in keys),
+            )), dict({k: values[k] for k in keys}, count=count))
+
+
+    @staticmethod
+    def merge(cursor, source, table, keys, value):
+
+        """
+        Sum rows from one table onto another.
+
+        Args:
+            cursor (sqlite3.Cursor)
+            source (str)
+            table (str)
+            keys (list): Columns to group by.
+            value (str): The summed column.
+        """
+
+        keys = ', '.join(keys)
+
+        # SQLite upsert, GROUP BY avoids the ON / join parsing ambiguity.
+        cursor.execute("""
+
+            INSERT INTO {table} ({keys}, {value})
+
+            SELECT {keys}, SUM({value}) FROM {source}
+            GROUP BY {keys}
+
+            ON CONFLICT ({keys}) DO UPDATE
+            SET {value} = {value} + excluded.{value}
+
+        """.format(table=table, source=source, keys=keys, value=value))
+
+
+BaseModel = declarative_base(cls=Base)
+
+
+@event.listens_for(Session, 'after_flush')
+def bump_revision_on_flush(session, context):
+
+    """
+    Bump the database revision when models are written through the ORM, so
+    cached query results don't outlive the data. (Bulk writes go through a
+    raw cursor and bump it themselves.)
+
+    Args:
+        session (Session)
+        context (UOWTransaction)
+    """
+
+    changed = chain(session.new, session.dirty, session.deleted)
+
+    if any(isinstance(obj, BaseModel) for obj in changed):
+        bump_revision(session.connection().connection.cursor())
+
+
+@event.listens_for(BaseModel, 'after_insert', propagate=True)
+def add_insert_to_totals(mapper, connection, target):
+
+    """
+    Keep the totals in sync with rows inserted through the ORM.
+    """
+
+    if not target.rollups:
+        return
+
+    values = {c.key: getattr(target, c.key) for c in mapper.column_attrs}
+
+    target.add_to_totals(connection, values, target.count)
+
+
+@event.listens_for(BaseModel, 'after_delete', propagate=True)
+def subtract_delete_from_totals(mapper, connection, target):
+
+    """
+    Keep the totals in sync with rows deleted through the ORM.
+    """
+
+    if not target.rollups:
+        return
+
+    values = {c.key: getattr(target, c.key) for c in mapper.column_attrs}
+
+    target.add_to_totals(connection, values, -target.count)
+
+
+@event.listens_for(BaseModel, 'after_update', propagate=True)
+def move_update_in_totals(mapper, connection, target):
+
+    """
+    Keep the totals in sync with rows updated through the ORM: take the old
+    row off its totals, add the new one.
+    """
+
+    if not target.rollups:
+        return
+
+    state = inspect(target)
+
+    old, new = {}, {}
+    for c in mapper.column_attrs:
+
+        history = state.attrs[c.key].history
+
+        new[c.key] = getattr(target, c.key)
+
+        old[c.key] = (
+            history.deleted[0] if history.deleted else new[c.key]
+        )
 
-BaseModel = declarative_base()
+    target.add_to_totals(connection, old, -old['count'])
+    target.add_to_totals(connection, new, new['count'])
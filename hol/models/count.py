@@ -4,15 +4,14 @@ import numpy as np
 
 from collections import defaultdict, Counter, OrderedDict
 
-from sqlalchemy import Column, Integer, String, PrimaryKeyConstraint
+from sqlalchemy import Column, Integer, ForeignKey, PrimaryKeyConstraint
 from sqlalchemy.schema import Index
-from sqlalchemy.sql import text, func
+from sqlalchemy.sql import func
 
 from hol import config
+from hol.cache import cached
 from hol.utils import flatten_dict
-from hol.models import BaseModel
-from hol.corpus import Corpus
-from hol.volume import Volume
+from hol.models import BaseModel, Token, CountTotal
 
 
 
@@ -22,15 +21,19 @@ class Count(BaseModel):
     __tablename__ = 'count'
 
     __table_args__ = (
-        PrimaryKeyConstraint('token', 'year'),
+        PrimaryKeyConstraint('token_id', 'year'),
+        Index('count_year_token_count', 'year', 'token_id', 'count'),
     )
 
-    token = Column(String, nullable=False)
+    token_id = Column(Integer, ForeignKey('token.id'), nullable=False)
 
     year = Column(Integer, nullable=False)
 
     count = Column(Integer, nullable=False)
 
+    # Per-year totals, kept in sync with the counts.
+    rollups = [(CountTotal, ['year'])]
+
 
     @classmethod
     def flush(cls, counts):
@@ -42,39 +45,15 @@ class Count(BaseModel):
             page (dict): year -> token -> count
         """
 
-        session = config.Session()
-
-        # SQLite "upsert."
-        query = text("""
-
-            INSERT OR REPLACE INTO {table!s} (token, year, count)
-
-            VALUES (
-                :token,
-                :year,
-                :count + COALESCE(
-                    (
-                        SELECT count FROM {table!s}
-                        WHERE token = :token AND year = :year
-                    ),
-                    0
-                )
-            )
-
-        """.format(table=cls.__tablename__))
-
-        for year, token, count in flatten_dict(counts):
-
-            session.execute(query, dict(
-                token=token,
-                year=year,
-                count=count,
-            ))
-
-        session.commit()
+        cls.upsert(
+            ['year', 'token', 'count'],
+            flatten_dict(counts),
+            cls.rollups,
+        )
 
 
     @classmethod
+    @cached
     def total_token_count(cls):
 
         """
@@ -87,13 +66,14 @@ class Count(BaseModel):
 
             res = (
                 session
-                .query(func.sum(cls.count))
+                .query(func.sum(CountTotal.count))
             )
 
             return res.scalar()
 
 
     @classmethod
+    @cached
     def token_year_count(cls, token, year):
 
         """
@@ -111,13 +91,16 @@ class Count(BaseModel):
             res = (
                 session
                 .query(func.sum(cls.count))
-                .filter(cls.token==token, cls.year==year)
+                .select_from(cls)
+                .join(Token, Token.id==cls.token_id)
+                .filter(Token.token==token, cls.year==year)
             )
 
             return res.scalar() or 0
 
 
     @classmethod
+    @cached
     def year_count_series(cls, year1, year2):
 
         """
@@ -133,16 +116,42 @@ class Count(BaseModel):
 
             res = (
                 session
-                .query(cls.year, func.sum(cls.count))
-                .filter(cls.year >= year1, cls.year <= year2)
-                .group_by(cls.year)
-                .order_by(cls.year)
+                .query(CountTotal.year, CountTotal.count)
+                .filter(CountTotal.year >= year1, CountTotal.year <= year2)
+                .order_by(CountTotal.year)
             )
 
             return OrderedDict(res.all())
 
 
     @classmethod
+    @cached
+    def year_token_counts(cls, year1, year2):
+
+        """
+        Get (year, token, count) rows for a range of years, in one query.
+
+        Args:
+            year1 (int)
+            year2 (int)
+
+        Returns: list [(year, token, count), ...]
+        """
+
+        with config.get_session() as session:
+
+            res = (
+                session
+                .query(cls.year, Token.token, cls.count)
+                .join(Token, Token.id==cls.token_id)
+                .filter(cls.year >= year1, cls.year <= year2)
+            )
+
+            return res.all()
+
+
+    @classmethod
+    @cached
     def token_counts_by_year(cls, year1=None, year2=None):
 
         """
@@ -157,7 +166,12 @@ class Count(BaseModel):
 
         with config.get_session() as session:
 
-            query = session.query(cls.token, func.sum(cls.count))
+            query = (
+                session
+                .query(Token.token, func.sum(cls.count))
+                .select_from(cls)
+                .join(Token, Token.id==cls.token_id)
+            )
 
             if year1:
                 query = query.filter(cls.year >= year1)
@@ -165,12 +179,13 @@ class Count(BaseModel):
             if year2:
                 query = query.filter(cls.year <= year2)
 
-            res = query.group_by(cls.token)
+            res = query.group_by(cls.token_id)
 
             return dict(res.all())
 
 
     @classmethod
+    @cached
     def total_count_by_year(cls, year1=None, year2=None):
 
         """
@@ -185,12 +200,12 @@ class Count(BaseModel):
 
         with config.get_session() as session:
 
-            query = session.query(func.sum(cls.count))
+            query = session.query(func.sum(CountTotal.count))
 
             if year1:
-                query = query.filter(cls.year >= year1)
+                query = query.filter(CountTotal.year >= year1)
 
             if year2:
-                query = query.filter(cls.year <= year2)
+                query = query.filter(CountTotal.year <= year2)
 
             return query.scalar() or 0
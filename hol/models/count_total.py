@@ -0,0 +1,16 @@
+
+
+from sqlalchemy import Column, Integer
+
+from hol.models import BaseModel
+
+
+
+class CountTotal(BaseModel):
+
+
+    __tablename__ = 'count_total'
+
+    year = Column(Integer, primary_key=True)
+
+    count = Column(Integer, nullable=False)
@@ -0,0 +1,180 @@
+
+
+import os
+
+from sqlalchemy import Column, Integer, Float, String
+from sqlalchemy.schema import Index
+from sqlalchemy.sql import func
+
+from hol import config
+from hol.models import BaseModel
+
+
+
+class Manifest(BaseModel):
+
+
+    __tablename__ = 'manifest'
+
+    __table_args__ = (
+        Index('manifest_language_year', 'language', 'year'),
+    )
+
+    path = Column(String, primary_key=True)
+
+    htrc_id = Column(String, nullable=False)
+
+    year = Column(Integer)
+
+    language = Column(String)
+
+    size = Column(Integer, nullable=False)
+
+    mtime = Column(Float, nullable=False)
+
+
+    @classmethod
+    def flush(cls, rows):
+
+        """
+        Write a set of volume records, replacing existing paths.
+
+        Args:
+            rows (list<dict>)
+        """
+
+        if not rows:
+            return
+
+        with config.get_session() as session:
+
+            query = cls.__table__.insert().prefix_with('OR REPLACE')
+
+            session.execute(query, rows)
+
+
+    @classmethod
+    def prune(cls, root=None):
+
+        """
+        Delete the rows for files that no longer exist.
+
+        Args:
+            root (str)
+
+        Returns: int, the number of deleted rows.
+        """
+
+        with config.get_session() as session:
+
+            query = cls.filter_query(session.query(cls.path), root)
+
+            gone = [path for path, in query if not os.path.exists(path)]
+
+            # Stay under the SQLite bound parameter limit.
+            for i in range(0, len(gone), 500):
+                (
+                    session
+                    .query(cls)
+                    .filter(cls.path.in_(gone[i:i+500]))
+                    .delete(synchronize_session=False)
+                )
+
+        return len(gone)
+
+
+    @classmethod
+    def filter_query(cls, query, root=None, language=None, year1=None,
+        year2=None):
+
+        """
+        Apply corpus root, language and year filters to a query.
+
+        Args:
+            query (Query)
+            root (str)
+            language (str)
+            year1 (int)
+            year2 (int)
+
+        Returns: Query
+        """
+
+        if root:
+            prefix = os.path.join(root, '')
+            query = query.filter(cls.path.startswith(prefix, autoescape=True))
+
+        if language:
+            query = query.filter(cls.language==language)
+
+        if year1:
+            query = query.filter(cls.year >= year1)
+
+        if year2:
+            query = query.filter(cls.year <= year2)
+
+        return query
+
+
+    @classmethod
+    def paths(cls, *args, **kwargs):
+
+        """
+        Generate paths for the volumes that match a filter.
+
+        Yields: str
+        """
+
+        with config.get_session() as session:
+
+            query = cls.filter_query(
+                session.query(cls.path),
+                *args, **kwargs
+            )
+
+            for path, in query.order_by(cls.path).yield_per(10000):
+                yield path
+
+
+    @classmethod
+    def volume_count(cls, *args, **kwargs):
+
+        """
+        How many volumes match a filter?
+
+        Returns: int
+        """
+
+        with config.get_session() as session:
+
+            query = cls.filter_query(
+                session.query(func.count(cls.path)),
+                *args, **kwargs
+            )
+
+            return query.scalar()
+
+
+    @classmethod
+    def stats(cls, root=None):
+
+        """
+        Map the recorded paths to their file stats.
+
+        Args:
+            root (str)
+
+        Returns: dict {path: (size, mtime), ...}
+        """
+
+        with config.get_session() as session:
+
+            query = cls.filter_query(
+                session.query(cls.path, cls.size, cls.mtime),
+                root,
+            )
+
+            return {
+                path: (size, mtime)
+                for path, size, mtime in query.yield_per(10000)
+            }
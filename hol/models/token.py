@@ -0,0 +1,49 @@
+
+
+from sqlalchemy import Column, Integer, String
+
+from hol import config
+from hol.models import BaseModel
+
+
+
+class Token(BaseModel):
+
+
+    __tablename__ = 'token'
+
+    id = Column(Integer, primary_key=True)
+
+    token = Column(String, nullable=False, unique=True)
+
+
+    @classmethod
+    def ids(cls, tokens):
+
+        """
+        Map a handful of tokens to integer ids, registering new tokens.
+
+        Args:
+            tokens (iter)
+
+        Returns: dict {token: id, ...}
+        """
+
+        tokens = set(tokens)
+
+        with config.get_session() as session:
+
+            cursor = session.connection().connection.cursor()
+
+            cursor.executemany(
+                'INSERT OR IGNORE INTO token (token) VALUES (?)',
+                [(t,) for t in tokens],
+            )
+
+            res = (
+                session
+                .query(cls.token, cls.id)
+                .filter(cls.token.in_(tokens))
+            )
+
+            return dict(res.all())
@@ -0,0 +1,126 @@
+
+
+import os
+import json
+
+from glob import glob
+
+from hol import config
+from hol.packed_volume import PackedVolume
+from hol.utils import grouper
+
+
+
+class PackedCorpus:
+
+
+    @classmethod
+    def from_env(cls):
+
+        """
+        Wrap the ENV-defined packed corpus root.
+
+        Returns: cls
+        """
+
+        return cls(config['packed_corpus'])
+
+
+    def __init__(self, path):
+
+        """
+        Canonicalize the corpus path.
+
+        Args:
+            path (str)
+        """
+
+        self.path = os.path.abspath(path)
+
+
+    @property
+    def vocab_path(self):
+
+        """
+        Get the path of the vocabulary used to pack the shards.
+
+        Returns: str
+        """
+
+        return os.path.join(self.path, 'vocab.json')
+
+
+    @property
+    def staging_path(self):
+
+        """
+        Get the directory that the transcode job writes new shards into.
+
+        Returns: str
+        """
+
+        return self.path+'.staging'
+
+
+    def write_vocab(self):
+
+        """
+        Save the current vocabulary next to the shards.
+        """
+
+        with open(self.vocab_path, 'w') as fh:
+            json.dump(config.vocab.tokens, fh)
+
+
+    def check_vocab(self):
+
+        """
+        Make sure the shards were packed with the current vocabulary, since
+        the records store token ids, not strings.
+
+        Raises: ValueError
+        """
+
+        with open(self.vocab_path) as fh:
+            tokens = json.load(fh)
+
+        if tokens != config.vocab.tokens:
+            raise ValueError(
+                'Packed corpus vocabulary does not match the config. '
+                'Re-run the transcode job.'
+            )
+
+
+    def paths(self):
+
+        """
+        Generate shard paths.
+
+        Yields: str
+        """
+
+        yield from sorted(glob(os.path.join(self.path, '*.bin')))
+
+
+    def path_groups(self, n=1):
+
+        """
+        Generate groups of shard paths.
+
+        Yields: list
+        """
+
+        for group in grouper(self.paths(), n):
+            yield group
+
+
+    def volumes(self):
+
+        """
+        Generate volume instances.
+
+        Yields: PackedVolume
+        """
+
+        for path in self.paths():
+            yield from PackedVolume.read_shard(path)
@@ -0,0 +1,238 @@
+
+
+import os
+import json
+import struct
+import numpy as np
+
+from hol import config
+from hol.page import Page
+from hol.volume import Volume
+from hol.utils import group_ranges_array
+
+
+class PackedVolume(Volume):
+
+
+    # Metadata bytes, page count, non-zero token count.
+    header = struct.Struct('<III')
+
+
+    @classmethod
+    def from_volume(cls, vol):
+
+        """
+        Pack the page-level token id counts for a volume.
+
+        Args:
+            vol (Volume)
+
+        Returns: cls
+        """
+
+        totals = []
+        indptr = [0]
+
+        ids = [np.empty(0, dtype=np.int32)]
+        counts = [np.empty(0, dtype=np.int32)]
+
+        for page in vol.pages():
+
+            page_ids, page_counts = page.token_id_counts()
+
+            totals.append(page.total_token_count)
+            indptr.append(indptr[-1] + len(page_ids))
+
+            ids.append(page_ids)
+            counts.append(page_counts)
+
+        data = dict(id=vol.id, metadata=vol.data['metadata'])
+
+        return cls(
+            data,
+            np.array(totals, dtype=np.int32),
+            np.array(indptr, dtype=np.int32),
+            np.concatenate(ids).astype(np.int32),
+            np.concatenate(counts).astype(np.int32),
+        )
+
+
+    @classmethod
+    def read(cls, buf, offset=0):
+
+        """
+        Read a record from a byte buffer.
+
+        Args:
+            buf (np.array): uint8 buffer, usually a memmap.
+            offset (int)
+
+        Returns: (cls, int) - The volume, offset of the next record.
+        """
+
+        meta_len, page_count, nnz = cls.header.unpack_from(buf, offset)
+        offset += cls.header.size
+
+        data = json.loads(buf[offset:offset+meta_len].tobytes().decode('utf8'))
+        offset += meta_len
+
+        arrays = []
+        for n in (page_count, page_count+1, nnz, nnz):
+
+            end = offset + 4*n
+
+            arrays.append(buf[offset:end].view(np.int32))
+            offset = end
+
+        return cls(data, *arrays), offset
+
+
+    @classmethod
+    def read_shard(cls, path):
+
+        """
+        Generate volumes from a shard file.
+
+        Args:
+            path (str)
+
+        Yields: cls
+        """
+
+        # Empty files can't be mapped.
+        if not os.path.getsize(path):
+            return
+
+        buf = np.memmap(path, dtype=np.uint8, mode='r')
+
+        offset = 0
+        while offset < len(buf):
+            vol, offset = cls.read(buf, offset)
+            yield vol
+
+
+    def __init__(self, data, totals, indptr, ids, counts):
+
+        """
+        Wrap the metadata and CSR page arrays.
+
+        Args:
+            data (dict): id, metadata
+            totals (np.array): Total token count for each page.
+            indptr (np.array): Offsets of each page in ids / counts.
+            ids (np.array): Token ids.
+            counts (np.array): Token counts.
+        """
+
+        self.data = data
+
+        self.totals = totals
+        self.indptr = indptr
+        self.ids = ids
+        self.counts = counts
+
+
+    def write(self, fh):
+
+        """
+        Write the volume as a binary record.
+
+        Args:
+            fh (file)
+        """
+
+        meta = json.dumps(self.data).encode('utf8')
+
+        # Pad the metadata to a multiple of 8 bytes. After the 12-byte
+        # header, this keeps the int32 arrays 4-byte aligned.
+        meta += b' ' * (-len(meta) % 8)
+
+        fh.write(self.header.pack(len(meta), len(self.totals), len(self.ids)))
+        fh.write(meta)
+
+        for array in (self.totals, self.indptr, self.ids, self.counts):
+            fh.write(array.astype(np.int32).tobytes())
+
+
+    def pages(self):
+
+        """
+        Rebuild page instances from the packed counts.
+
+        Yields: Page
+        """
+
+        for i, total in enumerate(self.totals):
+
+            i1, i2 = self.indptr[i], self.indptr[i+1]
+
+            counts = {
+                config.vocab.tokens[tid]: {'': int(count)}
+                for tid, count in zip(self.ids[i1:i2], self.counts[i1:i2])
+            }
+
+            yield Page({
+                'body': {
+                    'tokenCount': int(total),
+                    'tokenPosCount': counts,
+                }
+            })
+
+
+    def slice_array(self, i1, i2):
+
+        """
+        Sum the token counts for a range of pages.
+
+        Args:
+            i1 (int): First page.
+            i2 (int): Last page, exclusive.
+
+        Returns: np.array
+        """
+
+        j1, j2 = self.indptr[i1], self.indptr[i2]
+
+        counts = np.bincount(
+            self.ids[j1:j2],
+            weights=self.counts[j1:j2],
+            minlength=len(config.vocab),
+        )
+
+        return counts.astype(np.int64)
+
+
+    def token_array(self):
+
+        """
+        Count the total count of each token in all pages.
+
+        Returns: np.array
+        """
+
+        return self.slice_array(0, len(self.totals))
+
+
+    def anchored_token_arrays(self, anchors, sizes=(1000,)):
+
+        """
+        Get anchored token counts as sparse (ids, counts) pairs, for a set
+        of anchors and page group sizes at once.
+
+        Args:
+            anchors (list<str>)
+            sizes (list<int>)
+
+        Returns: dict {size: {anchor: {level: (ids, counts)}}}
+        """
+
+        levels = {}
+
+        for size in sizes:
+
+            levels[size] = {anchor: {} for anchor in anchors}
+
+            for i1, i2 in group_ranges_array(self.totals, size):
+                self.credit_anchors(levels[size], self.slice_array(i1, i2))
+
+        return levels
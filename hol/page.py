@@ -1,6 +1,6 @@
 
 
-import re
+import numpy as np
 
 from collections import Counter
 
@@ -42,22 +42,42 @@ class Page:
         Returns: Counter
         """
 
-        # Match letters.
-        letters = re.compile('^[a-z]+$')
-
         counts = Counter()
         for token, pc in self.data['body']['tokenPosCount'].items():
 
-            token = token.lower()
+            # Normalize, apply token whitelist.
+            tid = config.vocab.lookup(token)
 
-            # Ignore irregular tokens.
-            if not letters.match(token):
+            if tid is None:
                 continue
 
-            # Apply token whitelist.
-            if token not in config.tokens:
+            counts[config.vocab.tokens[tid]] += sum(pc.values())
+
+        return counts
+
+
+    def token_id_counts(self):
+
+        """
+        Count the total occurrences of each unique token, keyed by vocabulary
+        id. Casing variants can repeat an id.
+
+        Returns: (np.array, np.array) - ids, counts
+        """
+
+        ids, counts = [], []
+        for token, pc in self.data['body']['tokenPosCount'].items():
+
+            # Normalize, apply token whitelist.
+            tid = config.vocab.lookup(token)
+
+            if tid is None:
                 continue
 
-            counts[token] += sum(pc.values())
+            ids.append(tid)
+            counts.append(sum(pc.values()))
 
-        return counts
+        return (
+            np.array(ids, dtype=np.int64),
+            np.array(counts, dtype=np.int64),
+        )
@@ -0,0 +1,227 @@
+
+
+import os
+import json
+import numpy as np
+
+from numpy.lib.format import open_memmap
+
+from hol import config
+from hol.packed_corpus import PackedCorpus
+from hol.packed_volume import PackedVolume
+
+
+class PageMatrix:
+
+
+    # Row-level arrays.
+    row_arrays = ('totals', 'row_volume', 'row_year', 'row_page')
+
+    # Volume-level arrays.
+    volume_arrays = ('vol_ptr', 'vol_ids', 'vol_years', 'vol_languages')
+
+    # CSR arrays.
+    csr_arrays = ('indptr', 'indices', 'data')
+
+
+    @classmethod
+    def from_env(cls):
+
+        """
+        Open the ENV-defined matrix.
+
+        Returns: cls
+        """
+
+        return cls(config['page_matrix'])
+
+
+    @classmethod
+    def build(cls, path, corpus=None):
+
+        """
+        Write a page x token CSR matrix from the packed corpus. Two passes -
+        first size the arrays, then fill them in place on disk.
+
+        Args:
+            path (str)
+            corpus (PackedCorpus)
+
+        Returns: cls
+        """
+
+        corpus = corpus or PackedCorpus.from_env()
+        corpus.check_vocab()
+
+        os.makedirs(path, exist_ok=True)
+
+        ids, years, languages, page_counts, nnzs = [], [], [], [], []
+
+        for vol in corpus.volumes():
+            ids.append(vol.id)
+            years.append(vol.year)
+            languages.append(vol.language)
+            page_counts.append(len(vol.totals))
+            nnzs.append(len(vol.ids))
+
+        n_rows = sum(page_counts)
+        nnz = sum(nnzs)
+
+        def alloc(name, dtype, shape):
+            return open_memmap(
+                os.path.join(path, name+'.npy'),
+                mode='w+', dtype=dtype, shape=shape,
+            )
+
+        indptr = alloc('indptr', np.int64, (n_rows+1,))
+        indices = alloc('indices', np.int32, (nnz,))
+        data = alloc('data', np.int32, (nnz,))
+
+        totals = alloc('totals', np.int32, (n_rows,))
+        row_volume = alloc('row_volume', np.int32, (n_rows,))
+        row_year = alloc('row_year', np.int32, (n_rows,))
+        row_page = alloc('row_page', np.int32, (n_rows,))
+
+        indptr[0] = 0
+
+        r, j = 0, 0
+        for i, vol in enumerate(corpus.volumes()):
+
+            n, m = len(vol.totals), len(vol.ids)
+
+            indptr[r+1:r+n+1] = vol.indptr[1:].astype(np.int64) + j
+            indices[j:j+m] = vol.ids
+            data[j:j+m] = vol.counts
+
+            totals[r:r+n] = vol.totals
+            row_volume[r:r+n] = i
+            row_year[r:r+n] = vol.year
+            row_page[r:r+n] = np.arange(n)
+
+            r += n
+            j += m
+
+        for array in (indptr, indices, data, totals, row_volume, row_year,
+            row_page):
+            array.flush()
+
+        vol_ptr = np.zeros(len(ids)+1, dtype=np.int64)
+        np.cumsum(page_counts, out=vol_ptr[1:])
+
+        np.save(os.path.join(path, 'vol_ptr.npy'), vol_ptr)
+        np.save(os.path.join(path, 'vol_ids.npy'), np.array(ids))
+        np.save(os.path.join(path, 'vol_years.npy'), np.array(years))
+        np.save(os.path.join(path, 'vol_languages.npy'), np.array(languages))
+
+        with open(os.path.join(path, 'vocab.json'), 'w') as fh:
+            json.dump(config.vocab.tokens, fh)
+
+        return cls(path)
+
+
+    def __init__(self, path):
+
+        """
+        Memory-map the arrays.
+
+        Args:
+            path (str)
+        """
+
+        self.path = os.path.abspath(path)
+
+        for name in self.csr_arrays + self.row_arrays + self.volume_arrays:
+
+            array = np.load(
+                os.path.join(self.path, name+'.npy'),
+                mmap_mode='r',
+            )
+
+            setattr(self, name, array)
+
+
+    def __len__(self):
+
+        """
+        How many volumes in the matrix?
+
+        Returns: int
+        """
+
+        return len(self.vol_ids)
+
+
+    @property
+    def shape(self):
+
+        """
+        Get the (pages, tokens) shape.
+
+        Returns: tuple
+        """
+
+        return (len(self.totals), len(config.vocab))
+
+
+    def check_vocab(self):
+
+        """
+        Make sure the matrix was built with the current vocabulary.
+
+        Raises: ValueError
+        """
+
+        with open(os.path.join(self.path, 'vocab.json')) as fh:
+            tokens = json.load(fh)
+
+        if tokens != config.vocab.tokens:
+            raise ValueError(
+                'Page matrix vocabulary does not match the config. '
+                'Rebuild the matrix.'
+            )
+
+
+    def volume(self, i):
+
+        """
+        Wrap the rows for a volume, without copying the token arrays.
+
+        Args:
+            i (int)
+
+        Returns: PackedVolume
+        """
+
+        r1, r2 = self.vol_ptr[i], self.vol_ptr[i+1]
+
+        indptr = self.indptr[r1:r2+1]
+
+        j1, j2 = indptr[0], indptr[-1]
+
+        data = dict(
+            id=str(self.vol_ids[i]),
+            metadata=dict(
+                pubDate=str(self.vol_years[i]),
+                language=str(self.vol_languages[i]),
+            ),
+        )
+
+        return PackedVolume(
+            data,
+            self.totals[r1:r2],
+            indptr - j1,
+            self.indices[j1:j2],
+            self.data[j1:j2],
+        )
+
+
+    def volumes(self):
+
+        """
+        Generate volume instances.
+
+        Yields: PackedVolume
+        """
+
+        for i in range(len(self)):
+            yield self.volume(i)
@@ -0,0 +1,286 @@
+
+
+import os
+import json
+import numpy as np
+
+from itertools import islice
+from numpy.lib.format import open_memmap
+
+from hol import config
+from hol.models import Count, AnchoredCount
+from hol.vocabulary import Vocabulary
+
+
+class RangeIndex:
+
+
+    @classmethod
+    def from_count(cls, year1, year2, path=None):
+
+        """
+        Index year x token counts.
+
+        Args:
+            year1 (int)
+            year2 (int)
+            path (str): If set, write the sums to disk, memory-mapped.
+
+        Returns: cls
+        """
+
+        rows = Count.year_token_counts(year1, year2)
+
+        return cls.build(rows, range(year1, year2+1), path=path)
+
+
+    @classmethod
+    def from_anchored_count(cls, year1, year2, anchor=None, page_size=None,
+        path=None):
+
+        """
+        Index year x level x token counts for anchored pages.
+
+        Args:
+            year1 (int)
+            year2 (int)
+            anchor (str)
+            page_size (int)
+            path (str): If set, write the sums to disk, memory-mapped.
+
+        Returns: cls
+        """
+
+        levels = range(1, AnchoredCount.max_level(anchor, page_size)+1)
+
+        rows = AnchoredCount.year_level_token_counts(
+            year1, year2, anchor, page_size,
+        )
+
+        return cls.build(rows, range(year1, year2+1), levels, path)
+
+
+    @classmethod
+    def build(cls, rows, years, levels=None, path=None, batch_size=100000):
+
+        """
+        Accumulate counts into a dense array, then take cumulative sums down
+        the year (and level) axes in place.
+
+        Args:
+            rows (iter): (year, token, count) or (year, level, token, count)
+            years (range)
+            levels (range)
+            path (str)
+            batch_size (int)
+
+        Returns: cls
+        """
+
+        vocab = config.vocab
+
+        # Prefix sums have a leading zero row on each axis.
+        shape = (len(years)+1,)
+
+        if levels is not None:
+            shape += (len(levels)+1,)
+
+        shape += (len(vocab),)
+
+        if path:
+
+            os.makedirs(path, exist_ok=True)
+
+            sums = open_memmap(
+                os.path.join(path, 'sums.npy'),
+                mode='w+', dtype=np.int64, shape=shape,
+            )
+
+        else:
+            sums = np.zeros(shape, dtype=np.int64)
+
+        rows = iter(rows)
+
+        while True:
+
+            batch = list(islice(rows, batch_size))
+
+            if not batch:
+                break
+
+            ids = np.array([vocab.ids.get(r[-2], -1) for r in batch])
+
+            index = [np.array([r[0] for r in batch]) - years[0] + 1]
+
+            if levels is not None:
+                index.append(np.array([r[1] for r in batch]) - levels[0] + 1)
+
+            index.append(ids)
+
+            counts = np.array([r[-1] for r in batch], dtype=np.int64)
+
+            # Skip tokens outside of the vocabulary.
+            keep = ids >= 0
+
+            np.add.at(sums, tuple(i[keep] for i in index), counts[keep])
+
+        for axis in range(len(shape)-1):
+            np.cumsum(sums, axis=axis, out=sums)
+
+        index = cls(sums, years, levels, vocab.tokens)
+
+        if path:
+            sums.flush()
+            index.save(path)
+
+        return index
+
+
+    @classmethod
+    def load(cls, path):
+
+        """
+        Memory-map a saved index.
+
+        Args:
+            path (str)
+
+        Returns: cls
+        """
+
+        with open(os.path.join(path, 'meta.json')) as fh:
+            meta = json.load(fh)
+
+        with open(os.path.join(path, 'vocab.json')) as fh:
+            tokens = json.load(fh)
+
+        sums = np.load(os.path.join(path, 'sums.npy'), mmap_mode='r')
+
+        years = range(*meta['years'])
+
+        levels = range(*meta['levels']) if meta['levels'] else None
+
+        return cls(sums, years, levels, tokens)
+
+
+    def __init__(self, sums, years, levels=None, tokens=None):
+
+        """
+        Wrap a prefix-sum array.
+
+        Args:
+            sums (np.array)
+            years (range)
+            levels (range)
+            tokens (list)
+        """
+
+        self.sums = sums
+        self.years = years
+        self.levels = levels
+
+        self.vocab = Vocabulary(tokens or config.vocab.tokens)
+
+
+    def save(self, path):
+
+        """
+        Write the axis metadata and vocabulary next to the sums.
+
+        Args:
+            path (str)
+        """
+
+        meta = dict(years=[self.years.start, self.years.stop], levels=None)
+
+        if self.levels is not None:
+            meta['levels'] = [self.levels.start, self.levels.stop]
+
+        with open(os.path.join(path, 'meta.json'), 'w') as fh:
+            json.dump(meta, fh)
+
+        with open(os.path.join(path, 'vocab.json'), 'w') as fh:
+            json.dump(self.vocab.tokens, fh)
+
+
+    @staticmethod
+    def offsets(axis, v1=None, v2=None):
+
+        """
+        Map an inclusive range of values onto a pair of prefix-sum rows.
+
+        Args:
+            axis (range)
+            v1 (int)
+            v2 (int)
+
+        Returns: (int, int)
+        """
+
+        n = len(axis)
+
+        i1 = 0 if v1 is None else min(max(v1 - axis.start, 0), n)
+        i2 = n if v2 is None else min(max(v2 - axis.start + 1, 0), n)
+
+        return i1, max(i1, i2)
+
+
+    def window(self, year1=None, year2=None, level1=None, level2=None,
+        cols=slice(None)):
+
+        """
+        Sum the counts in a window of years (and levels).
+
+        Args:
+            year1 (int)
+            year2 (int)
+            level1 (int)
+            level2 (int)
+            cols (slice|int): Token ids, defaults to all.
+
+        Returns: np.array|int
+        """
+
+        s = self.sums
+
+        y1, y2 = self.offsets(self.years, year1, year2)
+
+        if self.levels is None:
+            return s[y2, cols] - s[y1, cols]
+
+        l1, l2 = self.offsets(self.levels, level1, level2)
+
+        return (
+            s[y2, l2, cols] - s[y1, l2, cols] -
+            s[y2, l1, cols] + s[y1, l1, cols]
+        )
+
+
+    def counts(self, *args, **kwargs):
+
+        """
+        Map token -> count for a window.
+
+        Returns: dict {token: count, ...}
+        """
+
+        return self.vocab.counts(self.window(*args, **kwargs))
+
+
+    def token_count(self, token, *args, **kwargs):
+
+        """
+        Count a single token in a window.
+
+        Args:
+            token (str)
+
+        Returns: int
+        """
+
+        j = self.vocab.ids.get(token)
+
+        if j is None:
+            return 0
+
+        return int(self.window(*args, cols=j, **kwargs))
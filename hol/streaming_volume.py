@@ -0,0 +1,185 @@
+
+
+import bz2
+import ijson
+
+from ijson.common import ObjectBuilder
+
+from hol.page import Page
+from hol.volume import Volume
+
+
+class StreamingVolume(Volume):
+
+
+    # Top-level fields that have to be read before the pages.
+    header_keys = {'id', 'metadata'}
+
+
+    @classmethod
+    def from_path(cls, path):
+
+        """
+        Wrap a volume archive without inflating the page data.
+
+        Args:
+            path (str)
+
+        Returns: cls
+        """
+
+        return cls(path)
+
+
+    def __init__(self, path):
+
+        """
+        Read the header fields from the compressed archive.
+
+        Args:
+            path (str)
+        """
+
+        self.path = path
+
+        self.fh = None
+        self.events = None
+
+        self.data = self.read_header()
+
+
+    def __enter__(self):
+
+        """
+        Use the volume as a context manager, to release the archive.
+
+        Returns: self
+        """
+
+        return self
+
+
+    def __exit__(self, *args):
+
+        """
+        Close the archive.
+        """
+
+        self.close()
+
+
+    def open(self):
+
+        """
+        Open a binary stream over the decompressed JSON.
+
+        Returns: file
+        """
+
+        return bz2.open(self.path, 'rb')
+
+
+    def read_header(self):
+
+        """
+        Parse the top-level fields outside of the page features. HTRC files
+        put `features` last, so this usually stops at the head of the
+        archive, and leaves the event stream open for pages() to pick up
+        where it left off. Otherwise, the features are skipped over to reach
+        the fields after them.
+
+        Raises: ValueError, if an id or metadata field is missing.
+
+        Returns: dict
+        """
+
+        self.fh = self.open()
+        self.events = ijson.parse(self.fh)
+
+        builders = {}
+
+        for prefix, event, value in self.events:
+
+            if prefix == '' and event == 'map_key':
+
+                key = value
+
+                # Stop before the first page event.
+                if key == 'features' and self.header_keys <= set(builders):
+                    break
+
+                if key != 'features':
+                    builders[key] = ObjectBuilder()
+
+            elif prefix != '' and key != 'features':
+                builders[key].event(event, value)
+
+        # Reached the end, pages() has to start over.
+        else:
+            self.close()
+
+        missing = self.header_keys - set(builders)
+
+        if missing:
+            self.close()
+            raise ValueError('{} is missing: {}'.format(
+                self.path, ', '.join(sorted(missing)),
+            ))
+
+        return {key: b.value for key, b in builders.items()}
+
+
+    def close(self):
+
+        """
+        Close the archive, if it's still open.
+        """
+
+        if self.fh:
+            self.fh.close()
+
+        self.fh = None
+        self.events = None
+
+
+    def pages(self):
+
+        """
+        Parse pages from the archive one at a time. The first call reads on
+        from the end of the header; later calls re-open the archive.
+
+        Yields: Page
+        """
+
+        if not self.events:
+            self.fh = self.open()
+            self.events = ijson.parse(self.fh)
+
+        events = self.events
+
+        # Hand the stream over to this call.
+        self.events = None
+
+        item = 'features.pages.item'
+
+        try:
+
+            builder = None
+
+            for prefix, event, value in events:
+
+                if prefix == item and event == 'start_map':
+                    builder = ObjectBuilder()
+
+                if builder is not None and (
+                    prefix == item or prefix.startswith(item+'.')
+                ):
+
+                    builder.event(event, value)
+
+                    if prefix == item and event == 'end_map':
+                        yield Page(builder.value)
+                        builder = None
+
+        finally:
+            self.close()
@@ -7,6 +7,7 @@ import statsmodels.api as sm
 
 from itertools import islice, chain
 from sklearn import preprocessing
+from scipy.signal import savgol_filter
 from collections import OrderedDict
 from functools import reduce
 
@@ -107,6 +108,24 @@ def group_counts(counts, size=1000):
     Returns: list
     """
 
+    counts = list(counts)
+
+    return [counts[i:j] for i, j in group_ranges(counts, size)]
+
+
+def _group_counts_naive(counts, size=1000):
+
+    """
+    The original quadratic page grouper, kept as a reference for the output
+    of the optimized versions, in the tests and the benchmark.
+
+    Args:
+        counts (list<int>)
+        size (int)
+
+    Returns: list
+    """
+
     groups = [[]]
 
     tsum = 0
@@ -116,25 +135,178 @@ def group_counts(counts, size=1000):
         s0 = sum(groups[-1])
         s1 = sum(groups[-1] + [c])
 
-        # Current group mean.
         m0 = (tsum + s0) / len(groups)
+        m1 = (tsum + s1) / len(groups)
+
+        if abs(m1-size) <= abs(m0-size):
+            groups[-1].append(c)
+
+        else:
+            groups.append([c])
+            tsum += s0
+
+    return groups
+
+
+def group_ranges(counts, size=1000):
+
+    """
+    Generate the (start, end) index ranges of the groups produced by
+    `group_counts`, in linear time. Works on any iterable.
+
+    Args:
+        counts (iter<int>)
+        size (int)
+
+    Yields: (int, int)
+    """
+
+    grouper = CountGrouper(size)
+
+    i = 0
+    for j, c in enumerate(counts):
+
+        if grouper.add(c):
+            yield (i, j)
+            i = j
+
+    # Always emit the open group, like `group_counts`.
+    yield (i, grouper.n)
+
+
+def group_ranges_array(counts, size=1000):
+
+    """
+    Compute the `group_counts` ranges from a NumPy array of (non-negative)
+    counts. A count starts group k+1 when it moves the running mean further
+    from the target than leaving it out - which, over prefix sums, is a
+    threshold search. So, each boundary is found with a binary search, not a
+    Python step per page.
+
+    Args:
+        counts (np.array)
+        size (int)
+
+    Returns: list<(int, int)>
+    """
+
+    counts = np.asarray(counts, dtype=np.int64)
+
+    n = len(counts)
+
+    # Running totals through / before each count.
+    after = np.cumsum(counts)
+    before = after - counts
+
+    # Midpoints of the before / after totals, doubled.
+    mids = before + after
+
+    ranges = []
+
+    i, k, lo = 0, 1, 0
+    while True:
+
+        j = max(int(np.searchsorted(mids, 2*k*size, side='left')), lo)
+
+        # Resolve exact ties with the same float comparison as CountGrouper.
+        # Zero counts never start a group.
+        while j < n and not (
+            abs(int(after[j])/k - size) > abs(int(before[j])/k - size)
+        ):
+            j += 1
+
+        if j >= n:
+            ranges.append((i, n))
+            return ranges
+
+        ranges.append((i, j))
+
+        i, k, lo = j, k+1, j+1
+
+
+class CountGrouper:
+
+
+    def __init__(self, size=1000):
+
+        """
+        Assign a stream of integer counts to groups, one count at a time, so
+        that the groups add up to roughly a given size. See `group_counts`.
+
+        Args:
+            size (int)
+        """
+
+        self.size = size
+
+        # Number of groups, including the open one.
+        self.groups = 1
+
+        # Sum of the closed groups.
+        self.tsum = 0
+
+        # Sum of the open group.
+        self.gsum = 0
+
+        # Number of counts added.
+        self.n = 0
+
+
+    def add(self, c):
+
+        """
+        Add the next count.
+
+        Args:
+            c (int)
+
+        Returns:
+            bool: True if the count starts a new group.
+        """
+
+        self.n += 1
+
+        # Current group mean.
+        m0 = (self.tsum + self.gsum) / self.groups
 
         # Mean if new count is added to the running group.
-        m1 = (tsum + s1) / len(groups)
+        m1 = (self.tsum + self.gsum + c) / self.groups
 
         # If adding the new count to the running group gets the average group
         # size closer to the target, add it to the group.
 
-        if abs(m1-size) <= abs(m0-size):
-            groups[-1].append(c)
+        if abs(m1-self.size) <= abs(m0-self.size):
+            self.gsum += c
+            return False
 
         # Otherwise, start a new group with the count.
 
         else:
-            groups.append([c])
-            tsum += s0
+            self.groups += 1
+            self.tsum += self.gsum
+            self.gsum = c
+            return True
 
-    return groups
+
+def sparse_add(a, b):
+
+    """
+    Add two sparse count vectors.
+
+    Args:
+        a (tuple): (ids, counts) arrays.
+        b (tuple): (ids, counts) arrays.
+
+    Returns: tuple (ids, counts), with sorted, unique ids.
+    """
+
+    ids, inverse = np.unique(np.concatenate([a[0], b[0]]), return_inverse=True)
+
+    counts = np.zeros(len(ids), dtype=np.int64)
+
+    np.add.at(counts, inverse, np.concatenate([a[1], b[1]]))
+
+    return ids, counts
 
 
 def enum(*seq, **named):
@@ -180,3 +352,163 @@ def lin_reg(series):
     x = sm.add_constant(x)
 
     return sm.OLS(y, x).fit()
+
+
+def contingency_scores(o11, o12, o21, o22, metrics=('g',)):
+
+    """
+    Score a batch of 2x2 contingency tables at once. Each argument is an array
+    with one cell per table:
+
+        [[o11, o12],
+         [o21, o22]]
+
+    "g" is the log-likelihood statistic with the Yates correction, matching
+    scipy's chi2_contingency(..., lambda_='log-likelihood'). "log_ratio" is
+    the log2 ratio of the first row's share of each column, and "pmi" is the
+    log2 ratio of o11 to its expected value.
+
+    Args:
+        o11 (array-like)
+        o12 (array-like)
+        o21 (array-like)
+        o22 (array-like)
+        metrics (iter): Any of 'g', 'log_ratio', 'pmi'.
+
+    Returns: dict {metric: np.array, ...}
+    """
+
+    o11, o12, o21, o22 = np.broadcast_arrays(o11, o12, o21, o22)
+
+    obs = np.array([
+        [o11, o12],
+        [o21, o22],
+    ], dtype=float)
+
+    rows = obs.sum(axis=1, keepdims=True)
+    cols = obs.sum(axis=0, keepdims=True)
+
+    exp = rows * cols / obs.sum(axis=(0, 1))
+
+    scores = {}
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+
+        for metric in metrics:
+
+            if metric == 'g':
+
+                # Yates: shift each cell up to 0.5 towards its expectation.
+                diff = exp - obs
+                cor = obs + np.sign(diff) * np.minimum(0.5, np.abs(diff))
+
+                # 0 * log(0) is taken as 0.
+                terms = np.where(cor > 0, cor * np.log(cor / exp), 0)
+
+                scores[metric] = 2 * terms.sum(axis=(0, 1))
+
+            elif metric == 'log_ratio':
+
+                scores[metric] = np.log2(
+                    (obs[0, 0] / cols[0, 0]) /
+                    (obs[0, 1] / cols[0, 1])
+                )
+
+            elif metric == 'pmi':
+                scores[metric] = np.log2(obs[0, 0] / exp[0, 0])
+
+            else:
+                raise ValueError('Unknown metric: {}'.format(metric))
+
+    return scores
+
+
+def fill_gaps(matrix):
+
+    """
+    Linearly interpolate missing (NaN) values down each column. Leading and
+    trailing gaps take the nearest observed value; empty columns stay NaN.
+
+    Args:
+        matrix (np.array)
+
+    Returns: np.array
+    """
+
+    n = matrix.shape[0]
+
+    valid = ~np.isnan(matrix)
+
+    idx = np.arange(n)[:, np.newaxis]
+
+    # Index of the last / next observed row for each cell.
+    prev = np.maximum.accumulate(np.where(valid, idx, -1), axis=0)
+    after = np.minimum.accumulate(np.where(valid, idx, n)[::-1], axis=0)[::-1]
+
+    prev = np.where(prev < 0, after, prev)
+    after = np.where(after >= n, prev, after)
+
+    # Empty columns point past the end; park them at 0, they stay NaN.
+    prev = np.where(prev >= n, 0, prev)
+    after = np.where(after >= n, 0, after)
+
+    cols = np.arange(matrix.shape[1])
+
+    v1 = matrix[prev, cols]
+    v2 = matrix[after, cols]
+
+    span = np.where(after > prev, after - prev, 1)
+
+    return v1 + (v2 - v1) * (idx - prev) / span
+
+
+def smooth_matrix(matrix, width=41, order=2):
+
+    """
+    Savitzky-Golay filter every column of a (years x tokens) matrix at once.
+    Missing (NaN) years are interpolated before filtering, and masked again
+    in the result.
+
+    Args:
+        matrix (np.array)
+        width (int)
+        order (int)
+
+    Returns: np.array
+    """
+
+    missing = np.isnan(matrix)
+
+    smooth = savgol_filter(fill_gaps(matrix), width, order, axis=0)
+
+    smooth[missing] = np.nan
+
+    return smooth
+
+
+def weighted_kde(points, weights, grid, bandwidth=5):
+
+    """
+    Evaluate a weighted Gaussian KDE on a grid. `weights` can be a vector
+    (one density) or a (points x series) matrix, in which case each column is
+    a separate density, all evaluated with one matrix product.
+
+    Args:
+        points (array-like)
+        weights (array-like)
+        grid (array-like)
+        bandwidth (float)
+
+    Returns: np.array (grid,) or (grid x series)
+    """
+
+    points = np.asarray(points, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    grid = np.asarray(grid, dtype=float)
+
+    z = (grid[:, np.newaxis] - points[np.newaxis, :]) / bandwidth
+
+    kernel = np.exp(-z**2 / 2) / (bandwidth * np.sqrt(2 * np.pi))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return kernel.dot(weights) / weights.sum(axis=0)
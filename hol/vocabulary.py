@@ -0,0 +1,163 @@
+
+
+import re
+import numpy as np
+
+from collections import namedtuple
+
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'size', 'hit_rate'])
+
+
+class Vocabulary:
+
+
+    # Match letters.
+    letters = re.compile('^[a-z]+$')
+
+
+    def __init__(self, tokens, cache_size=1000000):
+
+        """
+        Assign a dense integer id to each token.
+
+        Args:
+            tokens (iter)
+            cache_size (int): Max raw tokens in the normalization cache.
+        """
+
+        self.tokens = sorted(tokens)
+
+        self.ids = {t: i for i, t in enumerate(self.tokens)}
+
+        self.cache_size = cache_size
+
+        self.cache = {}
+        self.hits = 0
+        self.misses = 0
+
+
+    def __len__(self):
+
+        """
+        How many tokens in the vocabulary?
+
+        Returns: int
+        """
+
+        return len(self.tokens)
+
+
+    def __contains__(self, token):
+
+        """
+        Is a token in the vocabulary?
+
+        Args:
+            token (str)
+
+        Returns: bool
+        """
+
+        return token in self.ids
+
+
+    def lookup(self, raw):
+
+        """
+        Map a raw token to the id of its normalized form, or None if the token
+        is irregular or not whitelisted. Each raw form is classified once; the
+        cache is cleared when it fills up.
+
+        Args:
+            raw (str)
+
+        Returns: int|None
+        """
+
+        try:
+            tid = self.cache[raw]
+            self.hits += 1
+            return tid
+
+        except KeyError:
+            pass
+
+        self.misses += 1
+
+        token = raw.lower()
+
+        tid = self.ids.get(token) if self.letters.match(token) else None
+
+        if len(self.cache) >= self.cache_size:
+            self.cache.clear()
+
+        self.cache[raw] = tid
+
+        return tid
+
+
+    def cache_info(self):
+
+        """
+        Report normalization cache statistics.
+
+        Returns: CacheInfo
+        """
+
+        total = self.hits + self.misses
+
+        return CacheInfo(
+            hits=self.hits,
+            misses=self.misses,
+            size=len(self.cache),
+            hit_rate=round(self.hits / total, 4) if total else 0,
+        )
+
+
+    def zeros(self):
+
+        """
+        Make an empty count array, indexed by token id.
+
+        Returns: np.array
+        """
+
+        return np.zeros(len(self), dtype=np.int64)
+
+
+    def counts(self, array):
+
+        """
+        Convert a count array back into a token -> count map.
+
+        Args:
+            array (np.array)
+
+        Returns: dict {token: count, ...}
+        """
+
+        return {
+            self.tokens[i]: int(array[i])
+            for i in np.flatnonzero(array)
+        }
+
+
+    def sparse_counts(self, pair):
+
+        """
+        Convert a sparse (ids, counts) pair into a token -> count map.
+
+        Args:
+            pair (tuple)
+
+        Returns: dict {token: count, ...}
+        """
+
+        ids, counts = pair
+
+        return {
+            self.tokens[i]: int(c)
+            for i, c in zip(ids, counts)
+            if c
+        }
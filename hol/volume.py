@@ -2,11 +2,13 @@
 
 import json
 import bz2
+import numpy as np
 
 from collections import Counter, defaultdict
 
+from hol import config
 from hol.page import Page
-from hol.utils import group_counts
+from hol.utils import CountGrouper, sparse_add
 
 
 class Volume:
@@ -64,6 +66,18 @@ class Volume:
         return int(self.data['metadata']['pubDate'])
 
 
+    @property
+    def has_year(self):
+
+        """
+        Does the volume have a parseable publication year?
+
+        Returns: bool
+        """
+
+        return str(self.data['metadata'].get('pubDate', '')).isdigit()
+
+
     @property
     def language(self):
 
@@ -120,7 +134,8 @@ class Volume:
 
         """
         Get counts for tokens that appear on (grouped) pages with an "anchor"
-        token, broken out by the count of thethe anchor on the page.
+        token, broken out by the count of the anchor on the page. Walks the
+        pages once, keeping a single running counter for the open group.
 
         Args:
             anchor (str)
@@ -129,26 +144,125 @@ class Volume:
         Returns: dict
         """
 
-        pages = list(self.pages())
+        levels = defaultdict(Counter)
 
-        counts = [p.total_token_count for p in pages]
+        def close(chunk):
 
-        groups = group_counts(counts, size)
+            level = chunk.pop(anchor, None)
 
-        levels = defaultdict(Counter)
+            if level:
+                levels[level].update(chunk)
 
-        i = 0
-        for group in groups:
+            chunk.clear()
 
-            chunk = Counter()
+        grouper = CountGrouper(size)
 
-            for _ in group:
-                chunk += pages[i].token_counts()
-                i += 1
+        chunk = Counter()
 
-            level = chunk.pop(anchor, None)
+        for page in self.pages():
 
-            if level:
-                levels[level] += chunk
+            if grouper.add(page.total_token_count):
+                close(chunk)
+
+            chunk.update(page.token_counts())
+
+        close(chunk)
+
+        return levels
+
+
+    def token_array(self):
+
+        """
+        Count the total count of each token in all pages, indexed by
+        vocabulary id.
+
+        Returns: np.array
+        """
+
+        counts = config.vocab.zeros()
+
+        for page in self.pages():
+            np.add.at(counts, *page.token_id_counts())
+
+        return counts
+
+
+    @staticmethod
+    def credit_anchors(levels, chunk):
+
+        """
+        Add the counts for a page group to the level of each anchor that
+        appears in the group, leaving out the anchor's own count. Levels are
+        stored sparse, since each only holds a small slice of the vocabulary.
+
+        Args:
+            levels (dict): anchor -> level -> (ids, counts), updated in place.
+            chunk (np.array)
+        """
+
+        ids = np.flatnonzero(chunk)
+
+        for anchor, anchor_levels in levels.items():
+
+            anchor_id = config.vocab.ids[anchor]
+
+            level = int(chunk[anchor_id])
+
+            if not level:
+                continue
+
+            hit_ids = ids[ids != anchor_id]
+
+            pair = (hit_ids, chunk[hit_ids])
+
+            if level in anchor_levels:
+                anchor_levels[level] = sparse_add(anchor_levels[level], pair)
+
+            else:
+                anchor_levels[level] = pair
+
+
+    def anchored_token_arrays(self, anchors, sizes=(1000,)):
+
+        """
+        Get anchored token counts as sparse (ids, counts) pairs, for a set
+        of anchors and page group sizes at once. Walks the pages once,
+        keeping one running accumulator per group size, which is credited to
+        every anchor that appears in the group when it closes.
+
+        Args:
+            anchors (list<str>)
+            sizes (list<int>)
+
+        Returns: dict {size: {anchor: {level: (ids, counts)}}}
+        """
+
+        levels = {
+            size: {anchor: {} for anchor in anchors}
+            for size in sizes
+        }
+
+        groupers = {size: CountGrouper(size) for size in sizes}
+
+        chunks = {size: config.vocab.zeros() for size in sizes}
+
+        def close(size):
+            self.credit_anchors(levels[size], chunks[size])
+            chunks[size][:] = 0
+
+        for page in self.pages():
+
+            ids, counts = page.token_id_counts()
+
+            for size in sizes:
+
+                if groupers[size].add(page.total_token_count):
+                    close(size)
+
+                np.add.at(chunks[size], ids, counts)
+
+        for size in sizes:
+            close(size)
 
         return levels
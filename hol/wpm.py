@@ -2,32 +2,86 @@
 
 import numpy as np
 
-from scipy.signal import savgol_filter
-from sklearn.neighbors import KernelDensity
+from collections import OrderedDict
 
-from collections import OrderedDict, Counter
+from hol.vocabulary import Vocabulary
+from hol.utils import smooth_matrix, weighted_kde
 
 
 class WPM:
 
 
-    def tokens(self, min_count=0):
+    def __init__(self, rows):
 
         """
-        Get a set of all tokens.
+        Pack (year, token, count) rows into a dense years x tokens matrix of
+        words-per-million.
 
-        Returns: set
+        Args:
+            rows (iter)
         """
 
-        counts = Counter()
+        rows = list(rows)
+
+        self.years = np.array(sorted({r[0] for r in rows}), dtype=int)
+
+        self.vocab = Vocabulary({r[1] for r in rows})
+
+        self.counts = np.zeros((len(self.years), len(self.vocab)))
+
+        if rows:
+
+            years, tokens, counts = zip(*rows)
+
+            yi = np.searchsorted(self.years, years)
+            ti = np.array([self.vocab.ids[t] for t in tokens], dtype=int)
 
-        for year, wpm in self.wpms.items():
-            for token in wpm.keys():
-                counts[token] += 1
+            np.add.at(self.counts, (yi, ti), counts)
+
+        self.totals = self.counts.sum(axis=1)
+
+        self.matrix = 1e6 * self.counts / self.totals[:, np.newaxis]
+
+        self.smoothed = {}
+
+
+    @property
+    def wpms(self):
+
+        """
+        Map year -> token -> WPM.
+
+        Returns: OrderedDict {year: {token: wpm, ...}, ...}
+        """
+
+        return OrderedDict([
+
+            (year, {
+                self.vocab.tokens[j]: row[j]
+                for j in np.flatnonzero(row)
+            })
+
+            for year, row in zip(self.years.tolist(), self.matrix)
+
+        ])
+
+
+    def tokens(self, min_count=0):
+
+        """
+        Get all tokens that appear in at least `min_count` years.
+
+        Args:
+            min_count (int)
+
+        Returns: list
+        """
+
+        years = np.count_nonzero(self.counts, axis=0)
 
         return [
-            t for t, c in counts.items()
-            if c >= min_count
+            self.vocab.tokens[j]
+            for j in np.flatnonzero(years >= min_count)
         ]
 
 
@@ -42,22 +96,26 @@ class WPM:
         Returns: OrderedDict{year: wpm}
         """
 
-        series = OrderedDict()
+        j = self.vocab.ids.get(token)
 
-        for year, wpm in self.wpms.items():
+        if j is None:
+            return OrderedDict()
 
-            val = wpm.get(token)
+        col = self.matrix[:, j]
 
-            if val:
-                series[year] = val
+        mask = col > 0
 
-        return series
+        return OrderedDict(zip(
+            self.years[mask].tolist(),
+            col[mask].tolist(),
+        ))
 
 
     def smooth_series(self, token, width=41, order=2):
 
         """
-        Smooth the series for a word.
+        Smooth the series for a word. Reads the word's column from
+        smooth_all(), so the two always agree.
 
         Args:
             token (str)
@@ -67,11 +125,43 @@ class WPM:
         Returns: OrderedDict{year: wpm}
         """
 
-        series = self.series(token)
+        j = self.vocab.ids.get(token)
+
+        if j is None:
+            return OrderedDict()
+
+        col = self.smooth_all(width, order)[:, j]
+
+        mask = ~np.isnan(col)
+
+        return OrderedDict(zip(
+            self.years[mask].tolist(),
+            col[mask].tolist(),
+        ))
+
+
+    def smooth_all(self, width=41, order=2):
+
+        """
+        Smooth the WPM series for all words at once. Years where a word is
+        missing are NaN. Cached per (width, order).
+
+        Args:
+            width (int)
+            order (int)
+
+        Returns: np.array (years x tokens)
+        """
+
+        key = (width, order)
 
-        smooth = savgol_filter(list(series.values()), width, order)
+        if key not in self.smoothed:
 
-        return OrderedDict(zip(series.keys(), smooth))
+            matrix = np.where(self.matrix > 0, self.matrix, np.nan)
+
+            self.smoothed[key] = smooth_matrix(matrix, width, order)
+
+        return self.smoothed[key]
 
 
     def pdf(self, token, years, bandwidth=5):
@@ -86,19 +176,30 @@ class WPM:
         Returns: OrderedDict {year: density}
         """
 
+        years = list(years)
+
         series = self.series(token)
 
-        data = []
-        for year, wpm in series.items():
-            data += [year] * round(wpm)
+        # Weight each year by its rounded WPM.
+        weights = np.round(list(series.values()))
 
-        data = np.array(data)[:, np.newaxis]
+        pdf = weighted_kde(list(series.keys()), weights, years, bandwidth)
 
-        pdf = KernelDensity(bandwidth=bandwidth).fit(data)
+        return OrderedDict(zip(years, pdf.tolist()))
 
-        samples = OrderedDict()
 
-        for year in years:
-            samples[year] = np.exp(pdf.score(year))
+    def pdfs(self, years, bandwidth=5):
+
+        """
+        Estimate density functions for all tokens at once.
+
+        Args:
+            years (range)
+            bandwidth (float)
+
+        Returns: np.array (years x tokens)
+        """
 
-        return samples
+        return weighted_kde(
+            self.years, np.round(self.matrix), years, bandwidth,
+        )
@@ -1,22 +1,23 @@
 
 
+import warnings
 import numpy as np
 
 from collections import OrderedDict
-from scipy.signal import savgol_filter
-from statsmodels.nonparametric.kde import KDEUnivariate
+from collections.abc import Mapping
 from sklearn.covariance import EllipticEnvelope
 from scipy import stats
+from joblib import Parallel, delayed
 
 from hol.count_wpm import CountWPM
 from hol.anchored_count_wpm import AnchoredCountWPM
-from hol.utils import sort_dict
+from hol.utils import sort_dict, smooth_matrix, weighted_kde
 
 
 class WPMRatios:
 
 
-    def __init__(self, year1, year2):
+    def __init__(self, year1, year2, anchor=None, page_size=None):
 
         """
         Compute ratios between the baseline and filtered counts.
@@ -24,71 +25,162 @@ class WPMRatios:
         Args:
             year1 (int)
             year2 (int)
+            anchor (str)
+            page_size (int)
         """
 
         wpm0 = CountWPM(year1, year2)
-        wpm1 = AnchoredCountWPM(year1, year2)
+        wpm1 = AnchoredCountWPM(year1, year2, anchor, page_size)
 
-        self.ratios = {}
+        # Align the baseline with the anchored years and tokens.
+        base = np.zeros_like(wpm1.matrix)
 
-        for token in wpm1.tokens():
+        rows = np.isin(wpm1.years, wpm0.years)
+        cols = np.array([t in wpm0.vocab for t in wpm1.vocab.tokens], bool)
 
-            s0 = wpm0.series(token)
-            s1 = wpm1.series(token)
+        yi = np.searchsorted(wpm0.years, wpm1.years[rows])
+        ti = np.array([
+            wpm0.vocab.ids[t]
+            for t, c in zip(wpm1.vocab.tokens, cols) if c
+        ], dtype=int)
 
-            # Prune out years missing in the anchored series.
-            s0_trimmed = OrderedDict([
-                (year, s0[year])
-                for year in s1.keys()
-            ])
+        base[np.ix_(rows, cols)] = wpm0.matrix[np.ix_(yi, ti)]
 
-            vals0 = list(s0_trimmed.values())
-            vals1 = list(s1.values())
+        # Get ratio between anchored series and baseline, where anchored.
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratios = np.where(wpm1.matrix > 0, wpm1.matrix / base, np.nan)
 
-            # Get ratio between anchored series and baseline.
-            r = np.array(vals1) / np.array(vals0)
+        # Skip tokens that appear in fewer than 2 years.
+        keep = np.count_nonzero(~np.isnan(ratios), axis=0) > 1
 
-            series = OrderedDict(zip(s1.keys(), r))
+        self.years = wpm1.years
 
-            if len(series) > 1:
-                self.ratios[token] = series
+        self.tokens = [
+            t for t, k in zip(wpm1.vocab.tokens, keep)
+            if k
+        ]
 
+        self.matrix = ratios[:, keep]
 
-    def clean_series(self, token, discard=5):
+        self.ratios = RatioSeries(self.years, self.tokens, self.matrix)
+
+        self.masks = {}
+
+        self.column_masks = {}
+
+        self.smoothed = {}
+
+
+    def clean_all(self, discard=5, method='envelope', n_jobs=1):
 
         """
-        Remove outliers from the ratio series for a token.
+        Flag the inliers in every ratio series. Cached per (discard, method).
 
         Args:
             discard (int): Drop the most outlying X% of the data.
+            method (str): 'envelope' (sklearn), or 'median' - a faster,
+                vectorized approximation.
+            n_jobs (int): Processes for the 'envelope' method.
 
-        Returns: OrderedDict{year: wpm}
+        Returns: np.array (years x tokens, bool)
         """
 
-        series = self.ratios[token]
+        key = (discard, method)
 
-        X = np.array(list(series.values()))[:, np.newaxis]
+        if key not in self.masks:
 
-        env = EllipticEnvelope()
-        env.fit(X)
+            if method == 'median':
+                masks = median_masks(self.matrix, discard)
 
-        # Score each data point.
-        y_pred = env.decision_function(X).ravel()
+            elif method == 'envelope':
 
-        # Get the discard threshold.
-        threshold = stats.scoreatpercentile(y_pred, discard)
+                cols = Parallel(n_jobs=n_jobs)(
+                    delayed(column_mask)(self.matrix[:, j], discard, method)
+                    for j in range(self.matrix.shape[1])
+                )
+
+                masks = np.zeros(self.matrix.shape, dtype=bool)
+
+                for j, mask in enumerate(cols):
+                    masks[:, j] = mask
+
+            else:
+                raise ValueError('Unknown method: {}'.format(method))
+
+            self.masks[key] = masks
+
+        return self.masks[key]
+
+
+    def clean_column(self, j, discard=5, method='envelope', n_jobs=1):
+
+        """
+        Flag the inliers in a single ratio series. Reads the full masks if
+        clean_all() has already run; otherwise, only this column is fit.
+        Cached per (discard, method, column).
+
+        Args:
+            j (int): Column index.
+            discard (int)
+            method (str)
+            n_jobs (int): Unused, taken to match clean_all().
+
+        Returns: np.array (bool)
+        """
+
+        key = (discard, method)
+
+        if key in self.masks:
+            return self.masks[key][:, j]
+
+        if (key, j) not in self.column_masks:
+            self.column_masks[key, j] = column_mask(
+                self.matrix[:, j], discard, method,
+            )
+
+        return self.column_masks[key, j]
 
-        return OrderedDict([
-            (year, ratio)
-            for (year, ratio), pred in zip(series.items(), y_pred)
-            if pred > threshold
-        ])
+
+    def clean_matrix(self, *args, **kwargs):
+
+        """
+        Blank out the outliers in the ratio matrix.
+
+        Returns: np.array (years x tokens)
+        """
+
+        masks = self.clean_all(*args, **kwargs)
+
+        return np.where(masks, self.matrix, np.nan)
+
+
+    def clean_series(self, token, *args, **kwargs):
+
+        """
+        Remove outliers from the ratio series for a token.
+
+        Args:
+            token (str)
+
+        Returns: OrderedDict{year: wpm}
+        """
+
+        j = self.ratios.ids[token]
+
+        keep = self.clean_column(j, *args, **kwargs)
+
+        return OrderedDict(zip(
+            self.years[keep].tolist(),
+            self.matrix[keep, j].tolist(),
+        ))
 
 
     def smooth_series(self, token, width=41, order=2, *args, **kwargs):
 
         """
-        Smooth the ratio series for a word.
+        Smooth the ratio series for a word. smooth_matrix() filters each
+        column on its own, so this agrees with smooth_all(), without cleaning
+        and smoothing every other word.
 
         Args:
             token (str)
@@ -98,11 +190,51 @@ class WPMRatios:
         Returns: OrderedDict{year: wpm}
         """
 
-        series = self.clean_series(token, *args, **kwargs)
+        j = self.ratios.ids[token]
+
+        key = (width, order) + args + tuple(sorted(kwargs.items()))
+
+        if key in self.smoothed:
+            col = self.smoothed[key][:, j]
 
-        smooth = savgol_filter(list(series.values()), width, order)
+        else:
 
-        return OrderedDict(zip(series.keys(), smooth))
+            keep = self.clean_column(j, *args, **kwargs)
+
+            values = np.where(keep, self.matrix[:, j], np.nan)
+
+            col = smooth_matrix(values[:, np.newaxis], width, order)[:, 0]
+
+        mask = ~np.isnan(col)
+
+        return OrderedDict(zip(
+            self.years[mask].tolist(),
+            col[mask].tolist(),
+        ))
+
+
+    def smooth_all(self, width=41, order=2, *args, **kwargs):
+
+        """
+        Smooth the cleaned ratio series for all words at once. Years where a
+        word is missing are NaN. Cached per set of arguments.
+
+        Args:
+            width (int)
+            order (int)
+
+        Returns: np.array (years x tokens)
+        """
+
+        key = (width, order) + args + tuple(sorted(kwargs.items()))
+
+        if key not in self.smoothed:
+
+            matrix = self.clean_matrix(*args, **kwargs)
+
+            self.smoothed[key] = smooth_matrix(matrix, width, order)
+
+        return self.smoothed[key]
 
 
     def query_series(self, _lambda, *args, **kwargs):
@@ -128,6 +260,30 @@ class WPMRatios:
         return sort_dict(result)
 
 
+    def query_matrix(self, scorer, *args, **kwargs):
+
+        """
+        Score all ratio series at once with a vectorized scorer, which takes
+        the years and the (years x tokens) ratio matrix and returns a score
+        for each column. Sort descending.
+
+        Args:
+            scorer (func)
+
+        Returns: OrderedDict{token: score}
+        """
+
+        scores = scorer(self.years, self.matrix, *args, **kwargs)
+
+        result = OrderedDict([
+            (token, score)
+            for token, score in zip(self.tokens, scores.tolist())
+            if np.isfinite(score)
+        ])
+
+        return sort_dict(result)
+
+
     def pdf(self, token, years, bw=5, *args, **kwargs):
 
         """
@@ -141,18 +297,269 @@ class WPMRatios:
         Returns: OrderedDict {year: density}
         """
 
+        years = list(years)
+
         series = self.clean_series(token, *args, **kwargs)
 
         # Use the ratio values as weights.
         weights = np.array(list(series.values()))
 
-        # Fit the density estimate.
-        density = KDEUnivariate(list(series.keys()))
-        density.fit(fft=False, weights=weights, bw=bw)
+        pdf = weighted_kde(list(series.keys()), weights, years, bw)
+
+        return OrderedDict(zip(years, pdf.tolist()))
+
+
+    def pdfs(self, years, bw=5, *args, **kwargs):
+
+        """
+        Estimate density functions for all cleaned ratio series at once,
+        weighting each year by its ratio.
+
+        Args:
+            years (iter)
+            bw (int)
+
+        Returns: np.array (years x tokens)
+        """
+
+        matrix = self.clean_matrix(*args, **kwargs)
+
+        weights = np.where(np.isfinite(matrix), matrix, 0)
+
+        return weighted_kde(self.years, weights, years, bw)
+
+
+class RatioSeries(Mapping):
+
+
+    def __init__(self, years, tokens, matrix):
+
+        """
+        Map token -> ratio series, read from columns of the ratio matrix.
+
+        Args:
+            years (np.array)
+            tokens (list)
+            matrix (np.array)
+        """
+
+        self.years = years
+        self.matrix = matrix
+
+        self.ids = {t: i for i, t in enumerate(tokens)}
+
+
+    def __getitem__(self, token):
+
+        """
+        Pull the years with a ratio for a token.
+
+        Args:
+            token (str)
+
+        Returns: OrderedDict{year: ratio}
+        """
+
+        col = self.matrix[:, self.ids[token]]
+
+        mask = ~np.isnan(col)
+
+        return OrderedDict(zip(
+            self.years[mask].tolist(),
+            col[mask].tolist(),
+        ))
+
+
+    def __iter__(self):
+        return iter(self.ids)
+
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def median_masks(matrix, discard=5):
+
+    """
+    Flag inliers in each column of a matrix, by squared distance from the
+    column median - a vectorized, 1-D stand-in for EllipticEnvelope, which
+    ranks points by distance from a robust location.
+
+    Args:
+        matrix (np.array)
+        discard (int): Drop the most outlying X% of each column.
+
+    Returns: np.array (bool)
+    """
+
+    x = finite(matrix).filled(np.nan)
+
+    with warnings.catch_warnings():
+
+        # Empty columns give NaN medians and thresholds.
+        warnings.simplefilter('ignore', RuntimeWarning)
+
+        d = (x - np.nanmedian(x, axis=0)) ** 2
+
+        threshold = np.nanpercentile(d, 100 - discard, axis=0)
+
+    with np.errstate(invalid='ignore'):
+        return d < threshold
+
+
+def envelope_mask(values, discard=5):
+
+    """
+    Flag inliers in a series with sklearn's EllipticEnvelope.
+
+    Args:
+        values (np.array): Ratios, NaN for missing years.
+        discard (int): Drop the most outlying X% of the data.
+
+    Returns: np.array (bool)
+    """
+
+    mask = np.zeros(len(values), dtype=bool)
+
+    idx = np.flatnonzero(np.isfinite(values))
+
+    X = values[idx][:, np.newaxis]
+
+    env = EllipticEnvelope()
+    env.fit(X)
+
+    # Score each data point.
+    y_pred = env.decision_function(X).ravel()
+
+    # Get the discard threshold.
+    threshold = stats.scoreatpercentile(y_pred, discard)
+
+    mask[idx] = y_pred > threshold
+
+    return mask
+
+
+def column_mask(values, discard=5, method='envelope'):
+
+    """
+    Flag inliers in a single series. When EllipticEnvelope can't be fit -
+    e.g., on a flat series - fall back to the median method for the series,
+    instead of failing.
+
+    Args:
+        values (np.array): Ratios, NaN for missing years.
+        discard (int): Drop the most outlying X% of the data.
+        method (str): 'envelope' or 'median'.
+
+    Returns: np.array (bool)
+    """
+
+    if method == 'envelope':
+
+        try:
+            return envelope_mask(values, discard)
+
+        except ValueError:
+            method = 'median'
+
+    if method == 'median':
+        return median_masks(values[:, np.newaxis], discard)[:, 0]
+
+    raise ValueError('Unknown method: {}'.format(method))
+
+
+def finite(matrix):
+
+    """
+    Mask out missing and infinite ratios.
+
+    Args:
+        matrix (np.array)
+
+    Returns: np.ma.MaskedArray
+    """
+
+    return np.ma.masked_invalid(matrix)
+
+
+def slope(years, matrix):
+
+    """
+    OLS slope of each ratio series over time.
+
+    Args:
+        years (np.array)
+        matrix (np.array)
+
+    Returns: np.array
+    """
+
+    y = finite(matrix)
+
+    x = np.ma.array(
+        np.broadcast_to(years[:, np.newaxis], y.shape).astype(float),
+        mask=np.ma.getmaskarray(y),
+    )
+
+    dx = x - x.mean(axis=0)
+    dy = y - y.mean(axis=0)
+
+    slopes = (dx * dy).sum(axis=0) / (dx ** 2).sum(axis=0)
+
+    return slopes.filled(np.nan)
+
+
+def peak_year(years, matrix):
+
+    """
+    The year with the highest ratio in each series.
+
+    Args:
+        years (np.array)
+        matrix (np.array)
+
+    Returns: np.array
+    """
+
+    y = finite(matrix).filled(-np.inf)
+
+    return years[y.argmax(axis=0)].astype(float)
+
+
+def variance(years, matrix):
+
+    """
+    Variance of each ratio series.
+
+    Args:
+        years (np.array)
+        matrix (np.array)
+
+    Returns: np.array
+    """
+
+    return finite(matrix).var(axis=0).filled(np.nan)
+
+
+def late_early(years, matrix, split=None):
+
+    """
+    Ratio between the mean ratio after and before a split year.
+
+    Args:
+        years (np.array)
+        matrix (np.array)
+        split (int): Defaults to the middle of the year range.
+
+    Returns: np.array
+    """
+
+    if split is None:
+        split = (years.min() + years.max()) / 2
 
-        samples = OrderedDict()
+    y = finite(matrix)
 
-        for year in years:
-            samples[year] = density.evaluate(year)[0]
+    late = y[years >= split].mean(axis=0)
+    early = y[years < split].mean(axis=0)
 
-        return samples
+    return (late / early).filled(np.nan)
@@ -1,9 +1,12 @@
 
 
 from invoke import task
+from sqlalchemy import inspect, text
 
-from hol.models import BaseModel
+from hol.models import BaseModel, Count, AnchoredCount
 from hol import config
+from hol.count_columns import CountColumns
+from hol.corpus import Corpus
 
 
 @task
@@ -17,3 +20,181 @@ def init_db():
 
     # Create all tables.
     BaseModel.metadata.create_all(engine)
+
+    # Add indexes that are missing from existing tables.
+    inspector = inspect(engine)
+
+    for table in BaseModel.metadata.sorted_tables:
+
+        names = {i['name'] for i in inspector.get_indexes(table.name)}
+
+        for index in table.indexes:
+            if index.name not in names:
+                index.create(engine)
+
+    # Fill in the totals of counts indexed before the total tables existed.
+    with config.get_session() as session:
+
+        stale = [
+            model for model in (Count, AnchoredCount)
+            if session.query(model).first() and not any(
+                session.query(total).first() for total, _ in model.rollups
+            )
+        ]
+
+    for model in stale:
+        model.rebuild_totals()
+
+    # A fresh database restarts the revision count.
+    config.mem.clear(warn=False)
+
+
+@task
+def rebuild_totals():
+
+    """
+    Recompute the year and level total tables from the counts.
+    """
+
+    Count.rebuild_totals()
+    AnchoredCount.rebuild_totals()
+
+
+@task
+def migrate_token_ids(anchor=None, page_size=1000):
+
+    """
+    Move string-keyed count tables onto integer token ids, in place.
+
+    Anchored counts indexed before the `anchor` / `page_size` columns
+    existed are backfilled with the passed values. The anchor has to be
+    given explicitly in that case, since there's no safe default.
+    """
+
+    engine = config.build_engine()
+
+    # Add the token table.
+    BaseModel.metadata.create_all(engine)
+
+    inspector = inspect(engine)
+
+    # Values for key columns that old tables don't have.
+    defaults = dict(anchor=anchor, page_size=int(page_size))
+
+    models = {model.__tablename__: model for model in (Count, AnchoredCount)}
+
+    # Check all the tables before touching any of them.
+    tables = []
+    for model in (Count, AnchoredCount):
+
+        table = model.__table__
+
+        columns = {c['name'] for c in inspector.get_columns(table.name)}
+
+        if 'token_id' in columns:
+            continue
+
+        missing = [
+            c.name for c in table.columns
+            if c.name != 'token_id' and c.name not in columns
+        ]
+
+        for name in missing:
+            if defaults.get(name) is None:
+                raise ValueError(
+                    '{}.{} is missing, pass --{} to backfill it.'.format(
+                        table.name, name, name.replace('_', '-'),
+                    )
+                )
+
+        tables.append((table, missing))
+
+    with engine.begin() as conn:
+
+        for table, missing in tables:
+
+            names = [c.name for c in table.columns]
+
+            conn.execute(text("""
+                INSERT OR IGNORE INTO token (token)
+                SELECT DISTINCT token FROM {}
+            """.format(table.name)))
+
+            conn.execute(text('ALTER TABLE {0} RENAME TO {0}_old'.format(
+                table.name,
+            )))
+
+            # Free up the index names, which moved with the old table.
+            for index in table.indexes:
+                conn.execute(text('DROP INDEX IF EXISTS {}'.format(
+                    index.name,
+                )))
+
+            table.create(conn)
+
+            select = []
+            for name in names:
+
+                if name == 'token_id':
+                    select.append('token.id')
+
+                elif name in missing:
+                    select.append(':'+name)
+
+                else:
+                    select.append('old.'+name)
+
+            conn.execute(text("""
+                INSERT INTO {table} ({names})
+                SELECT {select} FROM {table}_old AS old
+                JOIN token ON token.token = old.token
+            """.format(
+                table=table.name,
+                names=', '.join(names),
+                select=', '.join(select),
+            )), {name: defaults[name] for name in missing})
+
+            conn.execute(text('DROP TABLE {}_old'.format(table.name)))
+
+    # Fill in the totals, which also bumps the revision.
+    for table, _ in tables:
+        models[table.name].rebuild_totals()
+
+    # Reclaim the space taken by the string keys.
+    with engine.connect() as conn:
+        conn.execute(text('VACUUM'))
+
+
+@task
+def check_manifest():
+
+    """
+    List the corpus files that changed since the manifest was indexed.
+    """
+
+    stale = Corpus.from_env().stale_paths()
+
+    for path in stale:
+        print(path)
+
+    print(len(stale), 'stale paths')
+
+
+@task
+def clear_cache():
+
+    """
+    Drop all cached query results.
+    """
+
+    config.mem.clear(warn=False)
+
+
+@task
+def export_columns(path):
+
+    """
+    Dump the count tables to memory-mappable .npy columns.
+    """
+
+    CountColumns.export(path)
@@ -0,0 +1,112 @@
+
+
+import tempfile
+import shutil
+import pytest
+
+from hol.models import Count
+from hol.cache import cached, db_revision
+from test.helpers import token_id
+
+
+pytestmark = pytest.mark.usefixtures('db')
+
+
+@pytest.yield_fixture
+def cache(config):
+
+    """
+    Enable query caching in a temporary directory.
+    """
+
+    path = tempfile.mkdtemp()
+
+    config.config.update({
+        'cache_queries': True,
+        'cache_dir': path,
+    })
+
+    config.mem = config.build_memory()
+
+    yield path
+
+    shutil.rmtree(path)
+
+
+def test_cache_until_flush(cache, config):
+
+    """
+    Results should be cached until a flush bumps the database revision.
+    """
+
+    Count.flush({1900: {'a': 1}})
+
+    assert Count.token_counts_by_year() == {'a': 1}
+    assert Count.token_counts_by_year() == {'a': 1}
+
+    Count.flush({1900: {'a': 3}})
+
+    assert Count.token_counts_by_year() == {'a': 1+3}
+
+
+def test_orm_writes_bump_revision(cache, config):
+
+    """
+    Rows written through the ORM should also invalidate cached results.
+    """
+
+    Count.flush({1900: {'a': 1}})
+
+    assert Count.token_counts_by_year() == {'a': 1}
+
+    with config.get_session() as session:
+        session.add(Count(token_id=token_id('b'), year=1900, count=2))
+
+    assert Count.token_counts_by_year() == {'a': 1, 'b': 2}
+
+
+def test_rebuild_totals_bumps_revision(cache, config):
+
+    """
+    Rebuilding the totals should invalidate cached results.
+    """
+
+    Count.flush({1900: {'a': 1}})
+
+    revision = db_revision()
+
+    Count.rebuild_totals()
+
+    assert db_revision() > revision
+
+
+def test_key_by_arguments(cache):
+
+    """
+    Results should be keyed by the query arguments.
+    """
+
+    Count.flush({1900: {'a': 1}, 1901: {'a': 2}})
+
+    assert Count.token_counts_by_year(1900, 1900) == {'a': 1}
+    assert Count.token_counts_by_year(1901, 1901) == {'a': 2}
+
+
+def test_key_by_code(cache):
+
+    """
+    Changing the body of a query should invalidate its cached results.
+    """
+
+    def query():
+        return 1
+
+    v1 = cached(query)
+
+    def query():
+        return 2
+
+    v2 = cached(query)
+
+    assert v1() == 1
+    assert v2() == 2
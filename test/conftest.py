@@ -4,6 +4,8 @@ import os
 import pytest
 import yaml
 import string
+import tempfile
+import shutil
 
 from hol import config as _config
 from hol.models import BaseModel
@@ -58,6 +60,48 @@ def mock_corpus(config):
     corpus.teardown()
 
 
+@pytest.yield_fixture
+def packed_corpus(config):
+
+    """
+    Point the packed corpus path at a temporary directory.
+
+    Yields:
+        str
+    """
+
+    path = tempfile.mkdtemp()
+
+    config.config.update({
+        'packed_corpus': path
+    })
+
+    yield path
+
+    shutil.rmtree(path)
+
+
+@pytest.yield_fixture
+def page_matrix(config):
+
+    """
+    Point the page matrix path at a temporary directory.
+
+    Yields:
+        str
+    """
+
+    path = tempfile.mkdtemp()
+
+    config.config.update({
+        'page_matrix': path
+    })
+
+    yield path
+
+    shutil.rmtree(path)
+
+
 @pytest.fixture()
 def db(config):
 
@@ -73,7 +117,7 @@ def db(config):
 
 
 @pytest.yield_fixture()
-def mpi(config, mock_corpus):
+def mpi(config, mock_corpus, packed_corpus, page_matrix):
 
     """
     Write the current configuration into the /tmp/.hol.yml file.
@@ -95,3 +139,5 @@ def tokens(config):
 
     for letter in string.ascii_lowercase:
         config.tokens.add(letter*3)
+
+    config.vocab = config.build_vocab()
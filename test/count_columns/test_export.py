@@ -0,0 +1,88 @@
+
+
+import tempfile
+import shutil
+import pytest
+
+from hol.models import Count, AnchoredCount
+from hol.count_columns import CountColumns
+
+
+pytestmark = pytest.mark.usefixtures('db')
+
+
+@pytest.yield_fixture
+def path():
+
+    """
+    Export the columns into a temporary directory.
+
+    Yields:
+        str
+    """
+
+    path = tempfile.mkdtemp()
+
+    yield path
+
+    shutil.rmtree(path)
+
+
+def test_export_count(path):
+
+    """
+    Count rows should round-trip through the columns.
+    """
+
+    Count.flush({
+        1900: {'a': 1, 'b': 2},
+        1901: {'a': 3},
+    })
+
+    columns = CountColumns.export(path)
+
+    count = columns.count
+
+    rows = set(zip(
+        [columns.tokens[i] for i in count['token_id']],
+        count['year'].tolist(),
+        count['count'].tolist(),
+    ))
+
+    assert rows == {
+        ('a', 1900, 1),
+        ('b', 1900, 2),
+        ('a', 1901, 3),
+    }
+
+
+def test_export_anchored_count(path):
+
+    """
+    AnchoredCount rows should round-trip, with anchor ids.
+    """
+
+    AnchoredCount.flush({
+        1000: {
+            'x': {1900: {1: {'a': 1}}},
+            'y': {1901: {2: {'b': 2}}},
+        },
+    })
+
+    columns = CountColumns(CountColumns.export(path).path)
+
+    count = columns.anchored_count
+
+    rows = set(zip(
+        [columns.anchors[i] for i in count['anchor_id']],
+        count['page_size'].tolist(),
+        count['year'].tolist(),
+        count['level'].tolist(),
+        [columns.tokens[i] for i in count['token_id']],
+        count['count'].tolist(),
+    ))
+
+    assert rows == {
+        ('x', 1000, 1900, 1, 'a', 1),
+        ('y', 1000, 1901, 2, 'b', 2),
+    }
@@ -0,0 +1,80 @@
+
+
+import pytest
+
+from hol.models import Count
+from hol.count_wpm import CountWPM
+from test.helpers import token_id
+
+
+pytestmark = pytest.mark.usefixtures('db')
+
+
+@pytest.fixture
+def counts(config):
+
+    """
+    Index counts for two tokens across three years.
+    """
+
+    rows = [
+        ('a', 1900, 1),
+        ('b', 1900, 3),
+        ('a', 1901, 2),
+        ('b', 1901, 2),
+        ('b', 1902, 4),
+    ]
+
+    with config.get_session() as session:
+        for token, year, count in rows:
+            session.add(Count(token_id=token_id(token), year=year, count=count))
+
+
+def test_series(counts):
+
+    """
+    Each year's count should be divided by the total for the year.
+    """
+
+    wpm = CountWPM(1900, 1902)
+
+    assert wpm.series('a') == {
+        1900: 1e6 * 1/4,
+        1901: 1e6 * 2/4,
+    }
+
+    assert wpm.series('b') == {
+        1900: 1e6 * 3/4,
+        1901: 1e6 * 2/4,
+        1902: 1e6 * 4/4,
+    }
+
+
+def test_year_range(counts):
+
+    """
+    Years outside of the range should be skipped.
+    """
+
+    wpm = CountWPM(1901, 1901)
+
+    assert list(wpm.series('b').keys()) == [1901]
+
+
+def test_tokens(counts):
+
+    """
+    Filter tokens by the number of years they appear in.
+    """
+
+    wpm = CountWPM(1900, 1902)
+
+    assert wpm.tokens() == ['a', 'b']
+    assert wpm.tokens(3) == ['b']
+
+
+def test_missing_token(counts):
+
+    wpm = CountWPM(1900, 1902)
+
+    assert wpm.series('c') == {}
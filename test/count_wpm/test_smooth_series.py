@@ -0,0 +1,62 @@
+
+
+import pytest
+import numpy as np
+
+from hol.models import Count
+from hol.count_wpm import CountWPM
+from test.helpers import token_id
+
+
+pytestmark = pytest.mark.usefixtures('db')
+
+
+@pytest.fixture
+def counts(config):
+
+    """
+    Index a token with a gap year, next to one that fills every year.
+    """
+
+    rows = [
+        ('a', 1900, 1),
+        ('a', 1901, 3),
+        ('a', 1903, 2),
+        ('a', 1904, 5),
+        ('b', 1900, 4),
+        ('b', 1901, 4),
+        ('b', 1902, 4),
+        ('b', 1903, 4),
+        ('b', 1904, 4),
+    ]
+
+    with config.get_session() as session:
+        for token, year, count in rows:
+            session.add(Count(token_id=token_id(token), year=year, count=count))
+
+
+def test_match_smooth_all(counts):
+
+    """
+    A single smoothed series should match its column in smooth_all(), and
+    skip the years where the token is missing.
+    """
+
+    wpm = CountWPM(1900, 1904)
+
+    series = wpm.smooth_series('a', 3, 1)
+
+    col = wpm.smooth_all(3, 1)[:, wpm.vocab.ids['a']]
+
+    assert list(series.keys()) == [1900, 1901, 1903, 1904]
+
+    assert list(series.values()) == pytest.approx(
+        col[~np.isnan(col)].tolist()
+    )
+
+
+def test_missing_token(counts):
+
+    wpm = CountWPM(1900, 1904)
+
+    assert wpm.smooth_series('c', 3, 1) == {}
@@ -4,6 +4,7 @@ import uuid
 
 from hol.page import Page
 from hol.volume import Volume
+from hol.models import Token
 
 
 def make_page(counts={}, token_count=100):
@@ -58,3 +59,17 @@ def make_vol(pages=[], year=1900, language='eng', id=None):
     }
 
     return Volume(data)
+
+
+def token_id(token):
+
+    """
+    Get the database id for a token, registering it if needed.
+
+    Args:
+        token (str)
+
+    Returns: int
+    """
+
+    return Token.ids([token])[token]
@@ -6,6 +6,7 @@ from subprocess import call
 
 from test.helpers import make_page, make_vol
 from hol.models import AnchoredCount
+from hol.jobs import IndexAnchoredCount
 
 
 pytestmark = pytest.mark.usefixtures('db', 'mpi')
@@ -311,3 +312,98 @@ def test_combine_counts_for_grouped_pages(mock_corpus):
 
     assert AnchoredCount.token_year_level_count('a', 1900, 1+2) == 1+2
     assert AnchoredCount.token_year_level_count('a', 1900, 3+4) == 3+4
+
+
+def test_index_multiple_anchors(mock_corpus):
+
+    """
+    Multiple anchors should be indexed in a single pass.
+    """
+
+    vol = make_vol(year=1900, pages=[
+        make_page(counts={
+
+            'anchor': {
+                'POS': 1
+            },
+
+            'other': {
+                'POS': 2
+            },
+
+            'a': {
+                'POS': 3
+            },
+
+        }),
+    ])
+
+    mock_corpus.add_vol(vol)
+
+    call([
+        'mpirun',
+        'bin/index_anchored_count',
+        'anchor',
+        'other',
+    ])
+
+    assert AnchoredCount.token_year_level_count('a', 1900, 1, 'anchor') == 3
+    assert AnchoredCount.token_year_level_count('a', 1900, 2, 'other') == 3
+
+    assert AnchoredCount.token_year_level_count('other', 1900, 1, 'anchor') == 2
+    assert AnchoredCount.token_year_level_count('anchor', 1900, 2, 'other') == 1
+
+
+def test_index_multiple_page_sizes(mock_corpus):
+
+    """
+    Repeated --page_size options should be indexed in a single pass.
+    """
+
+    vol = make_vol(year=1900, pages=[
+
+        make_page(token_count=100, counts={
+            'anchor': {
+                'POS': 1,
+            },
+            'a': {
+                'POS': 1,
+            },
+        }),
+
+        make_page(token_count=100, counts={
+            'anchor': {
+                'POS': 2,
+            },
+            'a': {
+                'POS': 2,
+            },
+        }),
+
+    ])
+
+    mock_corpus.add_vol(vol)
+
+    call([
+        'mpirun',
+        'bin/index_anchored_count',
+        'anchor',
+        '--page_size=100',
+        '--page_size=200',
+    ])
+
+    count = AnchoredCount.token_year_level_count
+
+    assert count('a', 1900, 1, page_size=100) == 1
+    assert count('a', 1900, 2, page_size=100) == 2
+    assert count('a', 1900, 1+2, page_size=200) == 1+2
+
+
+def test_reject_unknown_anchors():
+
+    """
+    Anchors outside of the vocabulary should fail before any work is done.
+    """
+
+    with pytest.raises(ValueError):
+        IndexAnchoredCount(['anchor', 'xqzxqz'])
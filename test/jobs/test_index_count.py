@@ -178,3 +178,33 @@ def test_ignore_non_english_volumes(mock_corpus):
 
     assert Count.token_year_count('a', 1900) == 1
     assert Count.token_year_count('b', 1900) == 2
+
+
+def test_ignore_undated_volumes(mock_corpus):
+
+    """
+    Volumes without an integer pubDate should be skipped.
+    """
+
+    v1 = make_vol(year=1900, pages=[
+        make_page(counts={
+            'a': {
+                'POS': 1
+            },
+        }),
+    ])
+
+    v2 = make_vol(year='19uu', pages=[
+        make_page(counts={
+            'a': {
+                'POS': 11
+            },
+        }),
+    ])
+
+    mock_corpus.add_vol(v1)
+    mock_corpus.add_vol(v2)
+
+    call(['mpirun', 'bin/index_count'])
+
+    assert Count.token_year_count('a', 1900) == 1
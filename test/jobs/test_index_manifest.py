@@ -0,0 +1,117 @@
+
+
+import os
+import pytest
+
+from subprocess import call
+
+from test.helpers import make_vol
+from hol.models import Manifest
+from hol.corpus import Corpus
+
+
+pytestmark = pytest.mark.usefixtures('db', 'mpi')
+
+
+def test_index_volume_metadata(mock_corpus, config):
+
+    """
+    IndexManifest should record the header fields and file stats.
+    """
+
+    v1 = make_vol(year=1901, language='eng')
+    v2 = make_vol(year='19uu', language='ger')
+
+    p1 = mock_corpus.add_vol(v1)
+    p2 = mock_corpus.add_vol(v2)
+
+    call(['mpirun', 'bin/index_manifest', '--group_size=1'])
+
+    with config.get_session() as session:
+
+        r1 = session.query(Manifest).get(p1)
+        r2 = session.query(Manifest).get(p2)
+
+        assert r1.htrc_id == v1.id
+        assert r1.year == 1901
+        assert r1.language == 'eng'
+        assert r1.size == os.stat(p1).st_size
+
+        assert r2.htrc_id == v2.id
+        assert r2.year == None
+        assert r2.language == 'ger'
+
+
+def test_filter_corpus_paths(mock_corpus):
+
+    """
+    Once the manifest is indexed, Corpus should read and filter paths from it.
+    """
+
+    p1 = mock_corpus.add_vol(make_vol(year=1901, language='eng'))
+    p2 = mock_corpus.add_vol(make_vol(year=1902, language='ger'))
+    p3 = mock_corpus.add_vol(make_vol(year=1903, language='eng'))
+
+    corpus = Corpus.from_env()
+
+    assert not corpus.has_manifest()
+    assert len(corpus) == 3
+
+    call(['mpirun', 'bin/index_manifest'])
+
+    corpus = Corpus.from_env()
+
+    assert corpus.has_manifest()
+    assert len(corpus) == 3
+
+    assert set(corpus.paths(language='eng')) == set([p1, p3])
+    assert set(corpus.paths(year1=1902)) == set([p2, p3])
+
+
+def test_list_stale_paths(mock_corpus):
+
+    """
+    Corpus#stale_paths() should list files that were added, changed, or
+    removed since the manifest was indexed.
+    """
+
+    p1 = mock_corpus.add_vol(make_vol(year=1901))
+    p2 = mock_corpus.add_vol(make_vol(year=1902))
+    p3 = mock_corpus.add_vol(make_vol(year=1903))
+
+    call(['mpirun', 'bin/index_manifest'])
+
+    corpus = Corpus.from_env()
+
+    assert corpus.stale_paths() == []
+
+    p4 = mock_corpus.add_vol(make_vol(year=1904))
+
+    # Swap in a different volume at the same path.
+    with open(p2, 'ab') as fh:
+        fh.write(b'0')
+
+    os.remove(p3)
+
+    assert corpus.stale_paths() == sorted([p2, p3, p4])
+
+
+def test_prune_deleted_paths(mock_corpus):
+
+    """
+    Re-indexing should drop the rows of deleted files.
+    """
+
+    p1 = mock_corpus.add_vol(make_vol(year=1901))
+    p2 = mock_corpus.add_vol(make_vol(year=1902))
+
+    call(['mpirun', 'bin/index_manifest'])
+
+    os.remove(p2)
+
+    call(['mpirun', 'bin/index_manifest'])
+
+    corpus = Corpus.from_env()
+
+    assert len(corpus) == 1
+    assert list(corpus.paths()) == [p1]
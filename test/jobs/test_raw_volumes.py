@@ -0,0 +1,29 @@
+
+
+from unittest import mock
+
+from hol.jobs import IndexCount
+
+
+def test_close_rejected_volumes(config):
+
+    """
+    Volumes that fail the filter should be closed, since their pages are
+    never read.
+    """
+
+    eng = mock.Mock(is_english=True, has_year=True)
+    ger = mock.Mock(is_english=False, has_year=True)
+
+    vols = {'eng': eng, 'ger': ger}
+
+    with mock.patch(
+        'hol.jobs.base.StreamingVolume.from_path',
+        side_effect=vols.get,
+    ):
+        accepted = list(IndexCount().raw_volumes(['eng', 'ger']))
+
+    assert accepted == [eng]
+
+    assert not eng.close.called
+    assert ger.close.called
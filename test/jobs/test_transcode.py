@@ -0,0 +1,178 @@
+
+
+import os
+import pytest
+
+from subprocess import call
+
+from test.helpers import make_page, make_vol
+from hol.models import Count, AnchoredCount
+from hol.packed_corpus import PackedCorpus
+
+
+pytestmark = pytest.mark.usefixtures('db', 'mpi')
+
+
+def test_index_count_from_shards(mock_corpus):
+
+    """
+    IndexCount should produce the same counts from the transcoded shards.
+    """
+
+    v1 = make_vol(year=1901, pages=[
+        make_page(counts={
+            'a': {
+                'POS': 1
+            },
+            'b': {
+                'POS': 2
+            },
+        }),
+    ])
+
+    v2 = make_vol(year=1901, pages=[
+        make_page(counts={
+            'a': {
+                'POS': 11
+            },
+        }),
+    ])
+
+    v3 = make_vol(year=1902, language='ger', pages=[
+        make_page(counts={
+            'a': {
+                'POS': 21
+            },
+        }),
+    ])
+
+    mock_corpus.add_vol(v1)
+    mock_corpus.add_vol(v2)
+    mock_corpus.add_vol(v3)
+
+    call(['mpirun', 'bin/transcode', '--group_size=1'])
+
+    corpus = PackedCorpus.from_env()
+
+    assert os.path.exists(corpus.vocab_path)
+    assert set([v.id for v in corpus.volumes()]) == set([v1.id, v2.id])
+
+    call(['mpirun', 'bin/index_count', '--source=packed'])
+
+    assert Count.token_year_count('a', 1901) == 1+11
+    assert Count.token_year_count('b', 1901) == 2
+    assert Count.token_year_count('a', 1902) == 0
+
+
+def test_rerun_replaces_shards(mock_corpus):
+
+    """
+    Re-running the job should replace the old shards, not add to them.
+    """
+
+    vol = make_vol(year=1901, pages=[
+        make_page(counts={
+            'a': {
+                'POS': 1
+            },
+        }),
+    ])
+
+    mock_corpus.add_vol(vol)
+
+    call(['mpirun', 'bin/transcode', '--group_size=1'])
+    call(['mpirun', 'bin/transcode', '--group_size=1'])
+
+    corpus = PackedCorpus.from_env()
+
+    assert [v.id for v in corpus.volumes()] == [vol.id]
+    assert not os.path.exists(corpus.staging_path)
+
+
+def test_index_anchored_count_from_shards(mock_corpus):
+
+    """
+    IndexAnchoredCount should produce the same counts from the shards.
+    """
+
+    vol = make_vol(year=1900, pages=[
+
+        make_page(token_count=100, counts={
+            'anchor': {
+                'POS': 1,
+            },
+            'a': {
+                'POS': 1,
+            },
+        }),
+
+        make_page(token_count=100, counts={
+            'anchor': {
+                'POS': 2,
+            },
+            'a': {
+                'POS': 2,
+            },
+        }),
+
+    ])
+
+    mock_corpus.add_vol(vol)
+
+    call(['mpirun', 'bin/transcode'])
+
+    call([
+        'mpirun',
+        'bin/index_anchored_count',
+        'anchor',
+        '--page_size=100',
+        '--source=packed',
+    ])
+
+    assert AnchoredCount.token_year_level_count('a', 1900, 1) == 1
+    assert AnchoredCount.token_year_level_count('a', 1900, 2) == 2
+
+
+def test_index_anchored_count_from_matrix(mock_corpus, page_matrix):
+
+    """
+    IndexAnchoredCount should produce the same counts from the page matrix.
+    """
+
+    vol = make_vol(year=1900, pages=[
+
+        make_page(token_count=100, counts={
+            'anchor': {
+                'POS': 1,
+            },
+            'a': {
+                'POS': 1,
+            },
+        }),
+
+        make_page(token_count=100, counts={
+            'anchor': {
+                'POS': 2,
+            },
+            'a': {
+                'POS': 2,
+            },
+        }),
+
+    ])
+
+    mock_corpus.add_vol(vol)
+
+    call(['mpirun', 'bin/transcode'])
+    call(['bin/build_page_matrix'])
+
+    call([
+        'mpirun',
+        'bin/index_anchored_count',
+        'anchor',
+        '--page_size=100',
+        '--source=matrix',
+    ])
+
+    assert AnchoredCount.token_year_level_count('a', 1900, 1) == 1
+    assert AnchoredCount.token_year_level_count('a', 1900, 2) == 2
@@ -36,6 +36,8 @@ class MockCorpus:
 
         Args:
             vol (Volume)
+
+        Returns: str
         """
 
         path = os.path.join(self.path, '{0}.json.bz2'.format(vol.id))
@@ -44,3 +46,5 @@ class MockCorpus:
 
         with open(path, 'wb') as fh:
             fh.write(data)
+
+        return path
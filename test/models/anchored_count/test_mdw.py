@@ -0,0 +1,84 @@
+
+
+import pytest
+
+from hol.models import Count, AnchoredCount
+from test.helpers import token_id
+
+
+pytestmark = pytest.mark.usefixtures('db')
+
+
+@pytest.fixture
+def counts(config):
+
+    """
+    Index anchored and baseline counts for a handful of tokens.
+    """
+
+    anchored = dict(a=50, b=20, c=10, d=2)
+    baseline = dict(a=100, b=200, c=1000, d=4)
+
+    with config.get_session() as session:
+
+        for token, count in anchored.items():
+            session.add(AnchoredCount(
+                anchor='anchor',
+                token_id=token_id(token),
+                year=1900,
+                page_size=1000,
+                anchor_count=1,
+                count=count,
+            ))
+
+        for token, count in baseline.items():
+            session.add(Count(
+                token_id=token_id(token),
+                year=1900,
+                count=count,
+            ))
+
+
+def test_top_k(counts):
+
+    """
+    With k, return the first k tokens of the full ranking.
+    """
+
+    ranking = AnchoredCount.mdw()
+
+    top2 = AnchoredCount.mdw(k=2)
+
+    assert list(top2.items()) == list(ranking.items())[:2]
+
+
+def test_min_count(counts):
+
+    """
+    With min_count, skip tokens with fewer anchored occurrences.
+    """
+
+    ranking = AnchoredCount.mdw(min_count=10)
+
+    assert set(ranking.keys()) == {'a', 'b', 'c'}
+
+
+def test_multiple_page_sizes():
+
+    """
+    With several page sizes indexed, mdw() should match a single-size run
+    when a size is passed, and refuse to sum across sizes when it isn't.
+    """
+
+    Count.flush({1900: dict(a=100, b=200, c=1000)})
+
+    AnchoredCount.flush({1000: {'anchor': {1900: {1: dict(a=50, b=20)}}}})
+
+    single = AnchoredCount.mdw()
+
+    AnchoredCount.flush({2000: {'anchor': {1900: {1: dict(a=60, c=30)}}}})
+
+    assert AnchoredCount.mdw(page_size=1000) == single
+
+    with pytest.raises(ValueError):
+        AnchoredCount.mdw()
@@ -3,6 +3,7 @@
 import pytest
 
 from hol.models import AnchoredCount
+from test.helpers import token_id
 
 
 pytestmark = pytest.mark.usefixtures('db')
@@ -31,29 +32,37 @@ def test_filter_by_year(year1, year2, count, config):
     with config.get_session() as session:
 
         session.add(AnchoredCount(
-            token='token',
+            anchor='anchor',
+            token_id=token_id('token'),
             year=1905,
+            page_size=1000,
             anchor_count=1,
             count=2,
         ))
 
         session.add(AnchoredCount(
-            token='token',
+            anchor='anchor',
+            token_id=token_id('token'),
             year=1910,
+            page_size=1000,
             anchor_count=2,
             count=4,
         ))
 
         session.add(AnchoredCount(
-            token='token',
+            anchor='anchor',
+            token_id=token_id('token'),
             year=1915,
+            page_size=1000,
             anchor_count=3,
             count=8,
         ))
 
         session.add(AnchoredCount(
-            token='token',
+            anchor='anchor',
+            token_id=token_id('token'),
             year=1920,
+            page_size=1000,
             anchor_count=4,
             count=16,
         ))
@@ -89,29 +98,37 @@ def test_filter_by_level(level1, level2, count, config):
     with config.get_session() as session:
 
         session.add(AnchoredCount(
-            token='token',
+            anchor='anchor',
+            token_id=token_id('token'),
             year=1900,
+            page_size=1000,
             anchor_count=1,
             count=2,
         ))
 
         session.add(AnchoredCount(
-            token='token',
+            anchor='anchor',
+            token_id=token_id('token'),
             year=1900,
+            page_size=1000,
             anchor_count=3,
             count=4,
         ))
 
         session.add(AnchoredCount(
-            token='token',
+            anchor='anchor',
+            token_id=token_id('token'),
             year=1900,
+            page_size=1000,
             anchor_count=5,
             count=8,
         ))
 
         session.add(AnchoredCount(
-            token='token',
+            anchor='anchor',
+            token_id=token_id('token'),
             year=1900,
+            page_size=1000,
             anchor_count=7,
             count=16,
         ))
@@ -122,3 +139,54 @@ def test_filter_by_level(level1, level2, count, config):
     )
 
     assert counts['token'] == count
+
+
+def test_filter_by_anchor(config):
+
+    """
+    When several anchors are indexed, only count rows for the passed one.
+    """
+
+    with config.get_session() as session:
+
+        session.add(AnchoredCount(
+            anchor='anchor1',
+            token_id=token_id('token'),
+            year=1900,
+            page_size=1000,
+            anchor_count=1,
+            count=2,
+        ))
+
+        session.add(AnchoredCount(
+            anchor='anchor2',
+            token_id=token_id('token'),
+            year=1900,
+            page_size=1000,
+            anchor_count=1,
+            count=4,
+        ))
+
+    counts = AnchoredCount.token_counts_by_year_and_level(anchor='anchor2')
+
+    assert counts['token'] == 4
+
+
+def test_require_anchor_when_ambiguous():
+
+    """
+    With several anchors indexed, leaving out the anchor should fail rather
+    than sum the co-occurrence counts together.
+    """
+
+    AnchoredCount.flush({1000: {
+        'anchor1': {1900: {1: {'token': 2}}},
+        'anchor2': {1900: {1: {'token': 4}}},
+    }})
+
+    with pytest.raises(ValueError):
+        AnchoredCount.token_counts_by_year_and_level()
+
+    counts = AnchoredCount.token_counts_by_year_and_level(anchor='anchor1')
+
+    assert counts['token'] == 2
@@ -3,6 +3,7 @@
 import pytest
 
 from hol.models import AnchoredCount
+from test.helpers import token_id
 
 
 pytestmark = pytest.mark.usefixtures('db')
@@ -31,57 +32,73 @@ def test_filter_by_year(year1, year2, count, config):
     with config.get_session() as session:
 
         session.add(AnchoredCount(
-            token='token1',
+            anchor='anchor',
+            token_id=token_id('token1'),
             year=1905,
+            page_size=1000,
             anchor_count=1,
             count=2,
         ))
 
         session.add(AnchoredCount(
-            token='token2',
+            anchor='anchor',
+            token_id=token_id('token2'),
             year=1905,
+            page_size=1000,
             anchor_count=1,
             count=4,
         ))
 
         session.add(AnchoredCount(
-            token='token1',
+            anchor='anchor',
+            token_id=token_id('token1'),
             year=1910,
+            page_size=1000,
             anchor_count=1,
             count=8,
         ))
 
         session.add(AnchoredCount(
-            token='token2',
+            anchor='anchor',
+            token_id=token_id('token2'),
             year=1910,
+            page_size=1000,
             anchor_count=1,
             count=16,
         ))
 
         session.add(AnchoredCount(
-            token='token1',
+            anchor='anchor',
+            token_id=token_id('token1'),
             year=1915,
+            page_size=1000,
             anchor_count=1,
             count=32,
         ))
 
         session.add(AnchoredCount(
-            token='token2',
+            anchor='anchor',
+            token_id=token_id('token2'),
             year=1915,
+            page_size=1000,
             anchor_count=1,
             count=64,
         ))
 
         session.add(AnchoredCount(
-            token='token1',
+            anchor='anchor',
+            token_id=token_id('token1'),
             year=1920,
+            page_size=1000,
             anchor_count=1,
             count=128,
         ))
 
         session.add(AnchoredCount(
-            token='token2',
+            anchor='anchor',
+            token_id=token_id('token2'),
             year=1920,
+            page_size=1000,
             anchor_count=1,
             count=256,
         ))
@@ -117,57 +134,73 @@ def test_filter_by_year(level1, level2, count, config):
     with config.get_session() as session:
 
         session.add(AnchoredCount(
-            token='token1',
+            anchor='anchor',
+            token_id=token_id('token1'),
             year=1900,
+            page_size=1000,
             anchor_count=1,
             count=2,
         ))
 
         session.add(AnchoredCount(
-            token='token2',
+            anchor='anchor',
+            token_id=token_id('token2'),
             year=1900,
+            page_size=1000,
             anchor_count=1,
             count=4,
         ))
 
         session.add(AnchoredCount(
-            token='token1',
+            anchor='anchor',
+            token_id=token_id('token1'),
             year=1900,
+            page_size=1000,
             anchor_count=3,
             count=8,
         ))
 
         session.add(AnchoredCount(
-            token='token2',
+            anchor='anchor',
+            token_id=token_id('token2'),
             year=1900,
+            page_size=1000,
             anchor_count=3,
             count=16,
         ))
 
         session.add(AnchoredCount(
-            token='token1',
+            anchor='anchor',
+            token_id=token_id('token1'),
             year=1900,
+            page_size=1000,
             anchor_count=5,
             count=32,
         ))
 
         session.add(AnchoredCount(
-            token='token2',
+            anchor='anchor',
+            token_id=token_id('token2'),
             year=1900,
+            page_size=1000,
             anchor_count=5,
             count=64,
         ))
 
         session.add(AnchoredCount(
-            token='token1',
+            anchor='anchor',
+            token_id=token_id('token1'),
             year=1900,
+            page_size=1000,
             anchor_count=7,
             count=128,
         ))
 
         session.add(AnchoredCount(
-            token='token2',
+            anchor='anchor',
+            token_id=token_id('token2'),
             year=1900,
+            page_size=1000,
             anchor_count=7,
             count=256,
         ))
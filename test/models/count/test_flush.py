@@ -0,0 +1,51 @@
+
+
+import pytest
+
+from hol.models import Count
+
+
+pytestmark = pytest.mark.usefixtures('db')
+
+
+def test_insert_counts():
+
+    Count.flush({
+        1900: {'a': 1, 'b': 2},
+        1901: {'a': 3},
+    })
+
+    assert Count.token_year_count('a', 1900) == 1
+    assert Count.token_year_count('b', 1900) == 2
+    assert Count.token_year_count('a', 1901) == 3
+
+
+def test_merge_existing_counts():
+
+    """
+    Flushing onto existing rows should add to the counts.
+    """
+
+    Count.flush({1900: {'a': 1, 'b': 2}})
+    Count.flush({1900: {'a': 3}, 1901: {'b': 4}})
+
+    assert Count.token_year_count('a', 1900) == 1+3
+    assert Count.token_year_count('b', 1900) == 2
+    assert Count.token_year_count('b', 1901) == 4
+
+
+def test_maintain_year_totals():
+
+    """
+    Flushing should add onto the per-year totals.
+    """
+
+    Count.flush({1900: {'a': 1, 'b': 2}, 1901: {'a': 3}})
+    Count.flush({1900: {'a': 4}})
+
+    assert Count.year_count_series(1900, 1901) == {
+        1900: 1+2+4,
+        1901: 3,
+    }
+
+    assert Count.total_token_count() == 1+2+3+4
@@ -0,0 +1,48 @@
+
+
+import pytest
+
+from hol import config
+from hol.models import Count
+
+
+pytestmark = pytest.mark.usefixtures('db')
+
+
+@pytest.mark.parametrize('sql', [
+
+    """
+    SELECT year, sum(count) FROM count
+    WHERE year >= 1900 AND year <= 1910
+    GROUP BY year
+    """,
+
+    """
+    SELECT token_id, sum(count) FROM count
+    WHERE year >= 1900 AND year <= 1910
+    GROUP BY token_id
+    """,
+
+    """
+    SELECT sum(count) FROM count
+    WHERE year >= 1900 AND year <= 1910
+    """,
+
+])
+def test_year_range_queries_use_covering_index(sql):
+
+    """
+    Year range queries should be answered from the year-first index.
+    """
+
+    Count.flush({
+        year: {'a': 1, 'b': 2}
+        for year in range(1890, 1920)
+    })
+
+    with config.get_session() as session:
+        plan = session.execute('EXPLAIN QUERY PLAN ' + sql).fetchall()
+
+    detail = ' '.join(row[-1] for row in plan)
+
+    assert 'COVERING INDEX count_year_token_count' in detail
@@ -3,6 +3,7 @@
 import pytest
 
 from hol.models import Count
+from test.helpers import token_id
 
 
 pytestmark = pytest.mark.usefixtures('db')
@@ -31,25 +32,25 @@ def test_filter_by_year(year1, year2, count, config):
     with config.get_session() as session:
 
         session.add(Count(
-            token='token',
+            token_id=token_id('token'),
             year=1905,
             count=2,
         ))
 
         session.add(Count(
-            token='token',
+            token_id=token_id('token'),
             year=1910,
             count=4,
         ))
 
         session.add(Count(
-            token='token',
+            token_id=token_id('token'),
             year=1915,
             count=8,
         ))
 
         session.add(Count(
-            token='token',
+            token_id=token_id('token'),
             year=1920,
             count=16,
         ))
@@ -3,6 +3,7 @@
 import pytest
 
 from hol.models import Count
+from test.helpers import token_id
 
 
 pytestmark = pytest.mark.usefixtures('db')
@@ -31,25 +32,25 @@ def test_filter_by_year(year1, year2, count, config):
     with config.get_session() as session:
 
         session.add(Count(
-            token='token',
+            token_id=token_id('token'),
             year=1905,
             count=2,
         ))
 
         session.add(Count(
-            token='token',
+            token_id=token_id('token'),
             year=1910,
             count=4,
         ))
 
         session.add(Count(
-            token='token',
+            token_id=token_id('token'),
             year=1915,
             count=8,
         ))
 
         session.add(Count(
-            token='token',
+            token_id=token_id('token'),
             year=1920,
             count=16,
         ))
@@ -60,3 +61,35 @@ def test_filter_by_year(year1, year2, count, config):
     )
 
     assert res == count
+
+
+def test_track_orm_updates_and_deletes(config):
+
+    """
+    Rows changed or removed through the session should move the totals.
+    """
+
+    a_id, b_id = token_id('a'), token_id('b')
+
+    with config.get_session() as session:
+
+        session.add(Count(token_id=a_id, year=1900, count=2))
+        session.add(Count(token_id=b_id, year=1900, count=4))
+
+    with config.get_session() as session:
+
+        a = session.query(Count).filter_by(token_id=a_id).one()
+        a.count = 3
+
+        b = session.query(Count).filter_by(token_id=b_id).one()
+        session.delete(b)
+
+    assert Count.total_count_by_year() == 3
+
+    with config.get_session() as session:
+
+        a = session.query(Count).filter_by(token_id=a_id).one()
+        a.year = 1910
+
+    assert Count.total_count_by_year(1900, 1900) == 0
+    assert Count.total_count_by_year(1910, 1910) == 3
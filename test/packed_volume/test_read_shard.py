@@ -0,0 +1,56 @@
+
+
+import os
+
+from hol import config
+from hol.packed_volume import PackedVolume
+from test.helpers import make_page, make_vol
+
+
+def test_round_trip(tmpdir):
+
+    """
+    Packed volumes should be read back with the same metadata and counts.
+    """
+
+    v1 = make_vol(year=1901, pages=[
+
+        make_page(token_count=10, counts={
+            'a': {
+                'POS': 1,
+            },
+            'B': {
+                'POS': 2,
+            },
+        }),
+
+        # Empty page.
+        make_page(token_count=0),
+
+        make_page(token_count=30, counts={
+            'b': {
+                'POS': 3,
+            },
+        }),
+
+    ])
+
+    v2 = make_vol(year=1902)
+
+    path = os.path.join(str(tmpdir), 'shard.bin')
+
+    with open(path, 'wb') as fh:
+        PackedVolume.from_volume(v1).write(fh)
+        PackedVolume.from_volume(v2).write(fh)
+
+    p1, p2 = list(PackedVolume.read_shard(path))
+
+    assert p1.id == v1.id
+    assert p1.year == 1901
+    assert p1.totals.tolist() == [10, 0, 30]
+
+    assert config.vocab.counts(p1.token_array()) == v1.token_counts()
+    assert p1.token_counts() == v1.token_counts()
+
+    assert p2.id == v2.id
+    assert len(p2.totals) == 0
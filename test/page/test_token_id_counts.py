@@ -0,0 +1,45 @@
+
+
+import numpy as np
+
+from hol import config
+from test.helpers import make_page
+
+
+def test_token_id_counts():
+
+    """
+    Page#token_id_counts() should map whitelisted tokens to vocabulary ids.
+    """
+
+    p = make_page({
+
+        'a': {
+            'POS1': 1,
+            'POS2': 2,
+        },
+
+        'B': {
+            'POS': 3,
+        },
+
+        # Irregular
+        'word1': {
+            'POS': 4,
+        },
+
+        # Not on whitelist
+        'zxcvb': {
+            'POS': 5,
+        },
+
+    })
+
+    counts = config.vocab.zeros()
+
+    np.add.at(counts, *p.token_id_counts())
+
+    assert config.vocab.counts(counts) == {
+        'a': 1+2,
+        'b': 3,
+    }
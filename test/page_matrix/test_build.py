@@ -0,0 +1,70 @@
+
+
+import os
+
+from hol import config
+from hol.packed_corpus import PackedCorpus
+from hol.packed_volume import PackedVolume
+from hol.page_matrix import PageMatrix
+from test.helpers import make_page, make_vol
+
+
+def test_build(packed_corpus, page_matrix):
+
+    """
+    Volumes read from the matrix should match the packed volumes.
+    """
+
+    v1 = make_vol(year=1901, pages=[
+
+        make_page(token_count=10, counts={
+            'a': {
+                'POS': 1,
+            },
+        }),
+
+        make_page(token_count=20, counts={
+            'a': {
+                'POS': 2,
+            },
+            'b': {
+                'POS': 3,
+            },
+        }),
+
+    ])
+
+    v2 = make_vol(year=1902, pages=[
+
+        make_page(token_count=30, counts={
+            'c': {
+                'POS': 4,
+            },
+        }),
+
+    ])
+
+    with open(os.path.join(packed_corpus, 'shard.bin'), 'wb') as fh:
+        PackedVolume.from_volume(v1).write(fh)
+        PackedVolume.from_volume(v2).write(fh)
+
+    PackedCorpus.from_env().write_vocab()
+
+    matrix = PageMatrix.build(page_matrix)
+
+    assert len(matrix) == 2
+    assert matrix.shape == (3, len(config.vocab))
+
+    assert matrix.row_volume.tolist() == [0, 0, 1]
+    assert matrix.row_year.tolist() == [1901, 1901, 1902]
+    assert matrix.row_page.tolist() == [0, 1, 0]
+
+    m1, m2 = matrix.volumes()
+
+    assert m1.id == v1.id
+    assert m1.year == 1901
+    assert m1.totals.tolist() == [10, 20]
+    assert m1.token_counts() == v1.token_counts()
+
+    assert m2.id == v2.id
+    assert m2.token_counts() == v2.token_counts()
@@ -0,0 +1,105 @@
+
+
+import random
+import tempfile
+import shutil
+import pytest
+
+from hol.range_index import RangeIndex
+
+
+pytestmark = pytest.mark.usefixtures('tokens')
+
+
+TOKENS = ['aaa', 'bbb', 'ccc']
+
+
+@pytest.fixture
+def rows():
+
+    """
+    Random (year, level, token, count) rows.
+    """
+
+    random.seed(1)
+
+    return [
+        (year, level, token, random.randint(1, 100))
+        for year in range(1900, 1910)
+        for level in range(1, 5)
+        for token in TOKENS
+        if random.random() > 0.3
+    ]
+
+
+def brute_force(rows, year1, year2, level1=None, level2=None):
+
+    counts = {}
+
+    for year, level, token, count in rows:
+
+        if year1 <= year <= year2 and (
+            level1 is None or level1 <= level <= level2
+        ):
+            counts[token] = counts.get(token, 0) + count
+
+    return counts
+
+
+@pytest.mark.parametrize('year1,year2', [
+    (1900, 1909),
+    (1903, 1903),
+    (1902, 1906),
+    (1890, 1901),
+    (1908, 1950),
+])
+def test_year_window(rows, year1, year2):
+
+    """
+    Year windows should match a brute-force sum.
+    """
+
+    index = RangeIndex.build(
+        [(y, t, c) for y, _, t, c in rows],
+        range(1900, 1910),
+    )
+
+    assert index.counts(year1, year2) == brute_force(rows, year1, year2)
+
+
+@pytest.mark.parametrize('year1,year2,level1,level2', [
+    (1900, 1909, 1, 4),
+    (1903, 1907, 2, 2),
+    (1900, 1904, 3, 4),
+])
+def test_year_level_window(rows, year1, year2, level1, level2):
+
+    """
+    Year x level windows should match a brute-force sum.
+    """
+
+    index = RangeIndex.build(rows, range(1900, 1910), range(1, 5))
+
+    assert index.counts(year1, year2, level1, level2) == \
+        brute_force(rows, year1, year2, level1, level2)
+
+    assert index.token_count('aaa', year1, year2, level1, level2) == \
+        brute_force(rows, year1, year2, level1, level2).get('aaa', 0)
+
+
+def test_load_memmap(rows):
+
+    """
+    Indexes written to disk should load back memory-mapped.
+    """
+
+    path = tempfile.mkdtemp()
+
+    RangeIndex.build(rows, range(1900, 1910), range(1, 5), path)
+
+    index = RangeIndex.load(path)
+
+    assert index.counts(1902, 1905, 2, 3) == \
+        brute_force(rows, 1902, 1905, 2, 3)
+
+    shutil.rmtree(path)
@@ -0,0 +1,102 @@
+
+
+import pytest
+
+from hol.streaming_volume import StreamingVolume
+from test.helpers import make_page, make_vol
+
+
+def test_read_header(mock_corpus):
+
+    """
+    StreamingVolume should parse the id and metadata without the pages.
+    """
+
+    v = make_vol(year=1901, language='ger', pages=[
+        make_page(counts={
+            'a': {
+                'POS': 1,
+            },
+        }),
+    ])
+
+    path = mock_corpus.add_vol(v)
+
+    sv = StreamingVolume.from_path(path)
+
+    assert sv.id == v.id
+    assert sv.year == 1901
+    assert sv.language == 'ger'
+
+    assert 'features' not in sv.data
+
+
+def test_header_after_features(mock_corpus):
+
+    """
+    Fields that come after `features` should still be read, and the pages
+    should still be available.
+    """
+
+    v = make_vol(year=1901, pages=[
+        make_page(counts={
+            'a': {
+                'POS': 1,
+            },
+        }),
+    ])
+
+    # Move the page features to the front of the file.
+    features = v.data.pop('features')
+    v.data = dict(features=features, **v.data)
+
+    path = mock_corpus.add_vol(v)
+
+    sv = StreamingVolume.from_path(path)
+
+    assert sv.id == v.id
+    assert sv.year == 1901
+
+    assert sv.token_counts() == {'a': 1}
+
+
+def test_missing_metadata(mock_corpus):
+
+    """
+    A volume without metadata should be rejected up front.
+    """
+
+    v = make_vol()
+
+    del v.data['metadata']
+
+    path = mock_corpus.add_vol(v)
+
+    with pytest.raises(ValueError):
+        StreamingVolume.from_path(path)
+
+
+def test_close(mock_corpus):
+
+    """
+    Closing the volume should release the archive that the header was read
+    from, and the pages should still be readable afterwards.
+    """
+
+    v = make_vol(pages=[
+        make_page(counts={
+            'a': {
+                'POS': 1,
+            },
+        }),
+    ])
+
+    path = mock_corpus.add_vol(v)
+
+    with StreamingVolume.from_path(path) as sv:
+        fh = sv.fh
+
+    assert fh.closed
+    assert sv.fh is None
+
+    assert sv.token_counts() == {'a': 1}
@@ -0,0 +1,81 @@
+
+
+from hol.streaming_volume import StreamingVolume
+from test.helpers import make_page, make_vol
+
+
+def test_combine_page_counts(mock_corpus):
+
+    """
+    StreamingVolume#token_counts() should add up page-specific counts.
+    """
+
+    v = make_vol(pages=[
+
+        make_page(counts={
+            'a': {
+                'POS': 1,
+            },
+            'b': {
+                'POS': 2,
+            },
+        }),
+
+        make_page(counts={
+            'b': {
+                'POS': 3,
+            },
+            'c': {
+                'POS': 4,
+            },
+        }),
+
+    ])
+
+    path = mock_corpus.add_vol(v)
+
+    sv = StreamingVolume.from_path(path)
+
+    assert sv.token_counts() == {
+        'a': 1,
+        'b': 2+3,
+        'c': 4,
+    }
+
+
+def test_anchored_token_counts(mock_corpus):
+
+    """
+    Grouped anchor counts should match the in-memory volume.
+    """
+
+    v = make_vol(pages=[
+
+        make_page(token_count=100, counts={
+            'anchor': {
+                'POS': 1,
+            },
+            'a': {
+                'POS': 1,
+            },
+        }),
+
+        make_page(token_count=100, counts={
+            'anchor': {
+                'POS': 2,
+            },
+            'a': {
+                'POS': 2,
+            },
+        }),
+
+    ])
+
+    path = mock_corpus.add_vol(v)
+
+    sv = StreamingVolume.from_path(path)
+
+    assert (
+        sv.anchored_token_counts('anchor', 100) ==
+        v.anchored_token_counts('anchor', 100)
+    )
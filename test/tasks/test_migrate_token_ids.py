@@ -0,0 +1,101 @@
+
+
+import pytest
+
+from sqlalchemy import text
+
+from hol.models import Count, AnchoredCount
+from tasks import migrate_token_ids
+
+
+pytestmark = pytest.mark.usefixtures('db')
+
+
+@pytest.fixture
+def old_tables(config):
+
+    """
+    Replace the count tables with the old string-keyed schema, from before
+    the anchor / page_size columns were added.
+    """
+
+    engine = config.build_engine()
+
+    with engine.begin() as conn:
+
+        conn.execute(text('DROP TABLE anchored_count'))
+        conn.execute(text('DROP TABLE count'))
+
+        conn.execute(text("""
+            CREATE TABLE count (
+                token VARCHAR NOT NULL,
+                year INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (token, year)
+            )
+        """))
+
+        conn.execute(text("""
+            CREATE TABLE anchored_count (
+                token VARCHAR NOT NULL,
+                year INTEGER NOT NULL,
+                anchor_count INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (token, year, anchor_count)
+            )
+        """))
+
+        for token, year, count in [
+            ('a', 1900, 100),
+            ('b', 1900, 200),
+            ('c', 1900, 1000),
+            ('a', 1901, 10),
+        ]:
+            conn.execute(
+                text('INSERT INTO count VALUES (:token, :year, :count)'),
+                dict(token=token, year=year, count=count),
+            )
+
+        for token, count in [('a', 50), ('b', 20), ('c', 10)]:
+            conn.execute(
+                text('INSERT INTO anchored_count VALUES (:token, 1900, 1, '
+                     ':count)'),
+                dict(token=token, count=count),
+            )
+
+
+def test_migrate_counts_and_totals(old_tables):
+
+    """
+    After the migration, the counts should be keyed on token ids, and the
+    year and level totals should be filled in.
+    """
+
+    migrate_token_ids(anchor='literature')
+
+    assert Count.token_year_count('a', 1900) == 100
+
+    assert Count.year_count_series(1900, 1901) == {
+        1900: 100+200+1000,
+        1901: 10,
+    }
+
+    assert AnchoredCount.total_count_by_year_and_level(
+        anchor='literature',
+        page_size=1000,
+    ) == 50+20+10
+
+    scores = AnchoredCount.mdw()
+
+    assert set(scores.keys()) == {'a', 'b', 'c'}
+    assert all(s != 0 for s in scores.values())
+
+
+def test_require_anchor(old_tables):
+
+    """
+    Old anchored counts can't be migrated without an anchor to backfill.
+    """
+
+    with pytest.raises(ValueError):
+        migrate_token_ids()
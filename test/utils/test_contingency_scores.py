@@ -0,0 +1,64 @@
+
+
+import pytest
+import numpy as np
+
+from scipy.stats import chi2_contingency
+
+from hol.utils import contingency_scores
+
+
+@pytest.mark.parametrize('table', [
+    [[10, 20], [30, 40]],
+    [[0, 5], [100, 1000]],
+    [[1, 0], [50, 50]],
+    [[3, 2], [10, 10000]],
+    [[1000, 2000], [1500, 10000]],
+])
+def test_match_chi2_contingency(table):
+
+    """
+    The G statistic should match scipy's log-likelihood chi2_contingency().
+    """
+
+    (o11, o12), (o21, o22) = table
+
+    g, _, _, _ = chi2_contingency(
+        np.array(table), lambda_='log-likelihood',
+    )
+
+    scores = contingency_scores(o11, o12, o21, o22)
+
+    assert scores['g'] == pytest.approx(g)
+
+
+def test_batch():
+
+    """
+    Score many tables in a single call.
+    """
+
+    rs = np.random.RandomState(0)
+
+    o11, o12, o21, o22 = rs.randint(1, 1000, (4, 100))
+
+    scores = contingency_scores(o11, o12, o21, o22, ['g', 'log_ratio', 'pmi'])
+
+    for i in range(100):
+
+        table = np.array([[o11[i], o12[i]], [o21[i], o22[i]]])
+
+        g, _, _, exp = chi2_contingency(table, lambda_='log-likelihood')
+
+        share1 = o11[i] / (o11[i] + o21[i])
+        share2 = o12[i] / (o12[i] + o22[i])
+
+        assert scores['g'][i] == pytest.approx(g)
+        assert scores['log_ratio'][i] == pytest.approx(np.log2(share1/share2))
+        assert scores['pmi'][i] == pytest.approx(np.log2(o11[i] / exp[0, 0]))
+
+
+def test_unknown_metric():
+
+    with pytest.raises(ValueError):
+        contingency_scores(1, 2, 3, 4, ['nope'])
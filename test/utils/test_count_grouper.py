@@ -0,0 +1,29 @@
+
+
+import random
+
+from hol.utils import CountGrouper, group_counts
+
+
+def test_match_group_counts():
+
+    """
+    CountGrouper should split a stream the same way as group_counts().
+    """
+
+    rng = random.Random(0)
+
+    counts = [rng.randint(0, 300) for _ in range(1000)]
+
+    grouper = CountGrouper(1000)
+
+    groups = [[]]
+    for c in counts:
+
+        if grouper.add(c):
+            groups.append([c])
+
+        else:
+            groups[-1].append(c)
+
+    assert groups == group_counts(counts, 1000)
@@ -1,16 +1,80 @@
 
 
 import random
+import pytest
+import numpy as np
 
-from hol.utils import group_counts
+from hol.utils import group_counts, group_ranges, group_ranges_array, \
+        _group_counts_naive
+
+
+def random_counts(n, high, seed=0):
+
+    """
+    Make a reproducible list of random page counts.
+
+    Args:
+        n (int)
+        high (int)
+        seed (int)
+
+    Returns: list<int>
+    """
+
+    rng = random.Random(seed)
+
+    return [rng.randint(0, high) for _ in range(n)]
 
 
 def test_group_counts():
 
-    counts = [random.randint(1, 5) for _ in range(1000)]
+    rng = random.Random(0)
+
+    counts = [rng.randint(1, 5) for _ in range(1000)]
 
     groups = group_counts(counts, 10)
 
     mean = sum(map(sum, groups)) / len(groups)
 
     assert abs(mean - 10) < 0.1
+
+
+@pytest.mark.parametrize('counts,size', [
+
+    # Empty volume.
+    ([], 1000),
+
+    # First count is too big for the first group.
+    ([5000, 10, 10], 1000),
+
+    # Zero counts.
+    ([0, 0, 500, 0, 500, 0], 500),
+
+    # Exact ties.
+    ([1000, 2000, 1000, 2000, 1000], 500),
+
+    # Short volume.
+    (random_counts(50, 300), 1000),
+
+    # Thousands of pages.
+    (random_counts(5000, 500), 1000),
+    (random_counts(5000, 3000), 500),
+
+])
+def test_match_reference(counts, size):
+
+    """
+    All of the grouping functions should match the original output.
+    """
+
+    groups = _group_counts_naive(counts, size)
+
+    assert group_counts(counts, size) == groups
+
+    assert [
+        counts[i:j] for i, j in group_ranges(iter(counts), size)
+    ] == groups
+
+    assert [
+        counts[i:j] for i, j in group_ranges_array(np.array(counts), size)
+    ] == groups
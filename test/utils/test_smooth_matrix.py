@@ -0,0 +1,57 @@
+
+
+import numpy as np
+
+from scipy.signal import savgol_filter
+
+from hol.utils import fill_gaps, smooth_matrix
+
+
+def test_match_savgol_filter():
+
+    """
+    Each column should match savgol_filter() on the column.
+    """
+
+    matrix = np.random.RandomState(0).rand(50, 10)
+
+    smooth = smooth_matrix(matrix, 11, 2)
+
+    for j in range(10):
+        assert np.allclose(smooth[:, j], savgol_filter(matrix[:, j], 11, 2))
+
+
+def test_mask_missing_years():
+
+    """
+    Missing years should be NaN in the result.
+    """
+
+    matrix = np.random.RandomState(0).rand(20, 3)
+    matrix[5, 1] = np.nan
+
+    smooth = smooth_matrix(matrix, 5, 2)
+
+    assert np.isnan(smooth[5, 1])
+    assert np.isnan(smooth).sum() == 1
+
+
+def test_fill_gaps():
+
+    nan = np.nan
+
+    matrix = np.array([
+        [nan, 1, nan],
+        [2,   nan, nan],
+        [nan, nan, nan],
+        [4,   4, nan],
+        [nan, nan, nan],
+    ])
+
+    assert np.allclose(fill_gaps(matrix), np.array([
+        [2, 1, nan],
+        [2, 2, nan],
+        [3, 3, nan],
+        [4, 4, nan],
+        [4, 4, nan],
+    ]), equal_nan=True)
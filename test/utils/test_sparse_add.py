@@ -0,0 +1,20 @@
+
+
+import numpy as np
+
+from hol.utils import sparse_add
+
+
+def test_sparse_add():
+
+    """
+    Add counts for shared ids, keep the others, and sort the ids.
+    """
+
+    a = (np.array([5, 1]), np.array([10, 20]))
+    b = (np.array([3, 5]), np.array([1, 2]))
+
+    ids, counts = sparse_add(a, b)
+
+    assert ids.tolist() == [1, 3, 5]
+    assert counts.tolist() == [20, 1, 10+2]
@@ -0,0 +1,45 @@
+
+
+import numpy as np
+
+from sklearn.neighbors import KernelDensity
+
+from hol.utils import weighted_kde
+
+
+def test_match_expanded_samples():
+
+    """
+    Integer weights should match a KDE fit on repeated samples.
+    """
+
+    points = [1900, 1901, 1905]
+    weights = [3, 1, 2]
+
+    grid = np.arange(1890, 1915)
+
+    data = np.repeat(points, weights)[:, np.newaxis]
+
+    kde = KernelDensity(bandwidth=5).fit(data)
+
+    expected = np.exp(kde.score_samples(grid[:, np.newaxis]))
+
+    assert np.allclose(weighted_kde(points, weights, grid, 5), expected)
+
+
+def test_batch():
+
+    """
+    Each column of a weight matrix should give a separate density.
+    """
+
+    points = np.arange(1900, 1910)
+    weights = np.random.RandomState(0).rand(10, 5)
+
+    grid = np.arange(1890, 1920)
+
+    pdfs = weighted_kde(points, weights, grid, 3)
+
+    for j in range(5):
+        pdf = weighted_kde(points, weights[:, j], grid, 3)
+        assert np.allclose(pdfs[:, j], pdf)
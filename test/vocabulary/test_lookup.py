@@ -0,0 +1,58 @@
+
+
+from hol.vocabulary import Vocabulary
+
+
+def test_lookup():
+
+    """
+    Vocabulary#lookup() should normalize raw tokens to whitelisted ids.
+    """
+
+    v = Vocabulary(['a', 'b'])
+
+    assert v.lookup('a') == v.ids['a']
+    assert v.lookup('B') == v.ids['b']
+
+    # Irregular
+    assert v.lookup('a1') == None
+
+    # Not on whitelist
+    assert v.lookup('c') == None
+
+
+def test_cache_hits():
+
+    """
+    Repeated raw tokens should be served from the cache.
+    """
+
+    v = Vocabulary(['a'])
+
+    v.lookup('a')
+    v.lookup('a')
+    v.lookup('A')
+    v.lookup('x')
+    v.lookup('x')
+
+    info = v.cache_info()
+
+    assert info.hits == 2
+    assert info.misses == 3
+    assert info.size == 3
+
+
+def test_clear_full_cache():
+
+    """
+    When the cache fills up, it should be cleared.
+    """
+
+    v = Vocabulary(['a'], cache_size=2)
+
+    v.lookup('a')
+    v.lookup('b')
+    v.lookup('c')
+
+    assert v.cache_info().size == 1
+    assert v.lookup('a') == v.ids['a']
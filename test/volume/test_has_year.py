@@ -0,0 +1,21 @@
+
+
+import pytest
+
+from test.helpers import make_vol
+
+
+@pytest.mark.parametrize('year,has_year', [
+    (1900, True),
+    ('18uu', False),
+    ('', False),
+])
+def test_has_year(year, has_year):
+
+    """
+    Volume#has_year should be false when pubDate isn't an integer.
+    """
+
+    v = make_vol(year=year)
+
+    assert v.has_year == has_year
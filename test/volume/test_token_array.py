@@ -0,0 +1,181 @@
+
+
+from hol import config
+from test.helpers import make_page, make_vol
+
+
+def test_token_array():
+
+    """
+    Volume#token_array() should match Volume#token_counts().
+    """
+
+    v = make_vol(pages=[
+
+        make_page(counts={
+            'a': {
+                'POS': 1,
+            },
+            'b': {
+                'POS': 2,
+            },
+        }),
+
+        make_page(counts={
+            'b': {
+                'POS': 3,
+            },
+            'B': {
+                'POS': 4,
+            },
+        }),
+
+    ])
+
+    assert config.vocab.counts(v.token_array()) == v.token_counts()
+
+
+def test_anchored_token_arrays():
+
+    """
+    Volume#anchored_token_arrays() should match anchored_token_counts().
+    """
+
+    v = make_vol(pages=[
+
+        make_page(token_count=100, counts={
+            'anchor': {
+                'POS': 1,
+            },
+            'a': {
+                'POS': 1,
+            },
+        }),
+
+        make_page(token_count=100, counts={
+            'a': {
+                'POS': 2,
+            },
+        }),
+
+        make_page(token_count=100, counts={
+            'anchor': {
+                'POS': 2,
+            },
+            'b': {
+                'POS': 3,
+            },
+        }),
+
+    ])
+
+    arrays = v.anchored_token_arrays(['anchor'], [100])
+
+    counts = {
+        level: config.vocab.sparse_counts(a)
+        for level, a in arrays[100]['anchor'].items()
+    }
+
+    assert counts == v.anchored_token_counts('anchor', 100)
+
+
+def test_multiple_anchors():
+
+    """
+    Each page group should be credited to every anchor it contains, without
+    the anchor's own count.
+    """
+
+    v = make_vol(pages=[
+
+        make_page(token_count=100, counts={
+            'a': {
+                'POS': 1,
+            },
+            'b': {
+                'POS': 2,
+            },
+            'c': {
+                'POS': 3,
+            },
+        }),
+
+        make_page(token_count=100, counts={
+            'a': {
+                'POS': 4,
+            },
+            'c': {
+                'POS': 5,
+            },
+        }),
+
+    ])
+
+    arrays = v.anchored_token_arrays(['a', 'b'], [100])
+
+    counts = {
+        anchor: {
+            level: config.vocab.sparse_counts(a)
+            for level, a in levels.items()
+        }
+        for anchor, levels in arrays[100].items()
+    }
+
+    assert counts == {
+        'a': {
+            1: {'b': 2, 'c': 3},
+            4: {'c': 5},
+        },
+        'b': {
+            2: {'a': 1, 'c': 3},
+        },
+    }
+
+
+def test_multiple_page_sizes():
+
+    """
+    Each page group size should be grouped independently, in the same pass.
+    """
+
+    v = make_vol(pages=[
+
+        make_page(token_count=100, counts={
+            'anchor': {
+                'POS': 1,
+            },
+            'a': {
+                'POS': 1,
+            },
+        }),
+
+        make_page(token_count=100, counts={
+            'anchor': {
+                'POS': 2,
+            },
+            'a': {
+                'POS': 2,
+            },
+        }),
+
+    ])
+
+    arrays = v.anchored_token_arrays(['anchor'], [100, 200])
+
+    counts = {
+        size: {
+            level: config.vocab.sparse_counts(a)
+            for level, a in anchors['anchor'].items()
+        }
+        for size, anchors in arrays.items()
+    }
+
+    assert counts == {
+        100: {
+            1: {'a': 1},
+            2: {'a': 2},
+        },
+        200: {
+            1+2: {'a': 1+2},
+        },
+    }
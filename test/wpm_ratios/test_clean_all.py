@@ -0,0 +1,62 @@
+
+
+import numpy as np
+
+from hol.wpm_ratios import median_masks, envelope_mask, column_mask
+
+
+def test_drop_outliers():
+
+    """
+    The most outlying points in each column should be flagged.
+    """
+
+    matrix = np.ones((20, 2))
+
+    matrix[:, 0] += np.linspace(0, 0.1, 20)
+    matrix[:, 1] += np.linspace(0, 0.1, 20)
+
+    matrix[3, 0] = 100
+    matrix[15, 1] = -100
+
+    masks = median_masks(matrix)
+
+    assert not masks[3, 0]
+    assert not masks[15, 1]
+
+    assert masks.sum(axis=0).tolist() == [19, 19]
+
+    assert not envelope_mask(matrix[:, 0])[3]
+    assert not envelope_mask(matrix[:, 1])[15]
+
+
+def test_skip_missing_years():
+
+    """
+    Missing years should never be flagged as inliers.
+    """
+
+    matrix = np.ones((10, 1)) + np.linspace(0, 1, 10)[:, np.newaxis]
+    matrix[2, 0] = np.nan
+    matrix[5, 0] = np.inf
+
+    assert not median_masks(matrix)[2, 0]
+    assert not median_masks(matrix)[5, 0]
+
+    assert not envelope_mask(matrix[:, 0])[2]
+    assert not envelope_mask(matrix[:, 0])[5]
+
+
+def test_fall_back_on_flat_series():
+
+    """
+    When EllipticEnvelope can't fit a series, use the median method for it.
+    """
+
+    values = np.array([1, 1, 1, 1, 5], dtype=float)
+
+    mask = column_mask(values)
+
+    assert mask.tolist() == median_masks(values[:, np.newaxis])[:, 0].tolist()
+
+    assert not mask[4]
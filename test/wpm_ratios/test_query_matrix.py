@@ -0,0 +1,119 @@
+
+
+import pytest
+
+from hol.models import Count, AnchoredCount
+from hol.wpm_ratios import WPMRatios, slope, peak_year
+from test.helpers import token_id
+
+
+pytestmark = pytest.mark.usefixtures('db')
+
+
+@pytest.fixture
+def counts(config):
+
+    """
+    Index baseline and anchored counts for two tokens. The anchored share of
+    "a" rises over time, and the share of "b" falls.
+    """
+
+    baseline = [
+        ('a', 1900, 10),
+        ('b', 1900, 10),
+        ('a', 1901, 10),
+        ('b', 1901, 10),
+        ('a', 1902, 10),
+        ('b', 1902, 10),
+    ]
+
+    anchored = [
+        ('a', 1900, 1),
+        ('b', 1900, 3),
+        ('a', 1901, 2),
+        ('b', 1901, 2),
+        ('a', 1902, 3),
+        ('b', 1902, 1),
+    ]
+
+    with config.get_session() as session:
+
+        for token, year, count in baseline:
+            session.add(Count(token_id=token_id(token), year=year, count=count))
+
+        for token, year, count in anchored:
+            session.add(AnchoredCount(
+                anchor='anchor',
+                token_id=token_id(token),
+                year=year,
+                page_size=1000,
+                anchor_count=1,
+                count=count,
+            ))
+
+
+def test_ratios(counts):
+
+    """
+    Each token should map to the ratio between anchored and baseline WPM.
+    """
+
+    ratios = WPMRatios(1900, 1902).ratios
+
+    assert set(ratios.keys()) == {'a', 'b'}
+
+    assert ratios['a'] == pytest.approx({
+        1900: (1/4) / (10/20),
+        1901: (2/4) / (10/20),
+        1902: (3/4) / (10/20),
+    })
+
+
+def test_query_matrix(counts):
+
+    """
+    Vectorized scorers should rank all tokens at once.
+    """
+
+    ratios = WPMRatios(1900, 1902)
+
+    assert list(ratios.query_matrix(slope).keys()) == ['a', 'b']
+
+    assert ratios.query_matrix(peak_year) == {
+        'a': 1902,
+        'b': 1900,
+    }
+
+
+def test_multiple_page_sizes():
+
+    """
+    With several page sizes indexed, ratios for one size should match a
+    single-size run, and leaving out the size should fail.
+    """
+
+    baseline = {
+        year: dict(a=10, b=10)
+        for year in (1900, 1901)
+    }
+
+    Count.flush(baseline)
+
+    AnchoredCount.flush({1000: {'anchor': {
+        1900: {1: dict(a=1, b=3)},
+        1901: {1: dict(a=2, b=2)},
+    }}})
+
+    single = dict(WPMRatios(1900, 1901).ratios['a'])
+
+    AnchoredCount.flush({2000: {'anchor': {
+        1900: {1: dict(a=5, b=1)},
+        1901: {1: dict(a=1, b=5)},
+    }}})
+
+    ratios = WPMRatios(1900, 1901, page_size=1000).ratios
+
+    assert dict(ratios['a']) == single
+
+    with pytest.raises(ValueError):
+        WPMRatios(1900, 1901)
@@ -0,0 +1,70 @@
+
+
+import pytest
+import numpy as np
+
+from hol.models import Count, AnchoredCount
+from hol.wpm_ratios import WPMRatios
+from test.helpers import token_id
+
+
+pytestmark = pytest.mark.usefixtures('db')
+
+
+@pytest.fixture
+def counts(config):
+
+    """
+    Index baseline counts for every year, and anchored counts with a gap.
+    """
+
+    anchored = [
+        ('a', 1900, 1),
+        ('a', 1901, 3),
+        ('a', 1903, 2),
+        ('a', 1904, 5),
+        ('b', 1900, 2),
+        ('b', 1901, 2),
+        ('b', 1902, 2),
+        ('b', 1903, 2),
+        ('b', 1904, 2),
+    ]
+
+    with config.get_session() as session:
+
+        for token in ('a', 'b'):
+            for year in range(1900, 1905):
+                session.add(Count(
+                    token_id=token_id(token),
+                    year=year,
+                    count=10,
+                ))
+
+        for token, year, count in anchored:
+            session.add(AnchoredCount(
+                anchor='anchor',
+                token_id=token_id(token),
+                year=year,
+                page_size=1000,
+                anchor_count=1,
+                count=count,
+            ))
+
+
+def test_match_smooth_all(counts):
+
+    """
+    A single smoothed series should match its column in smooth_all().
+    """
+
+    ratios = WPMRatios(1900, 1904)
+
+    series = ratios.smooth_series('a', 3, 1, method='median')
+
+    col = ratios.smooth_all(3, 1, method='median')[:, ratios.ratios.ids['a']]
+
+    assert 1902 not in series
+
+    assert list(series.values()) == pytest.approx(
+        col[~np.isnan(col)].tolist()
+    )